@@ -2,6 +2,7 @@
 
 import json
 import logging
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 
@@ -38,7 +39,8 @@ class CakeProcessor:
             Processing results with metadata
         """
         logging.info(f"Starting Confluence processing for page {page_id}")
-        start_time = datetime.now()
+        start = time.perf_counter()
+        exported_at = datetime.now()
         
         # Fetch content recursively
         confluence_data = self.confluence_client.fetch_content_recursive(
@@ -55,7 +57,7 @@ class CakeProcessor:
             }
         
         # Generate output filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = exported_at.strftime("%Y%m%d_%H%M%S")
         base_filename = f"confluence_export_{page_id}_{timestamp}"
         
         # Process based on output format
@@ -65,7 +67,7 @@ class CakeProcessor:
             "export_metadata": {
                 "fetch_mode": "confluence",
                 "fetch_identifier": f"confluence_{page_id}",
-                "exported_at": start_time.isoformat(),
+                "exported_at": exported_at.isoformat(),
                 "base_url": self.config.confluence_base_url,
                 "include_permissions": self.config.include_permissions,
                 "simplified_output": self.config.simplified_output
@@ -85,8 +87,8 @@ class CakeProcessor:
             results["files_created"].append(json_filename)
             
         elif output_format == "jsonl":
-            # Save combined JSONL
-            documents = RagProcessor.flatten_confluence_tree(
+            # Save combined JSONL, converting pages as they are written
+            documents = RagProcessor.iter_flatten_confluence_tree(
                 confluence_data, 
                 self.config.confluence_base_url,
                 self.config.simplified_output
@@ -98,8 +100,8 @@ class CakeProcessor:
             results["document_count"] = doc_count
             
         elif output_format == "jsonl-per-page":
-            # Save individual JSONL files
-            documents = RagProcessor.flatten_confluence_tree(
+            # Save individual JSONL files, converting pages as they are written
+            documents = RagProcessor.iter_flatten_confluence_tree(
                 confluence_data,
                 self.config.confluence_base_url, 
                 self.config.simplified_output
@@ -121,12 +123,12 @@ class CakeProcessor:
             )
             
             results["files_created"].extend([json_filename, f"{json_filename.replace('.json', '_jsonl_files')}/"])
-            results["document_count"] = len(documents)
+            results["document_count"] = file_count
             results["file_count"] = file_count
         
         # Calculate processing time
-        end_time = datetime.now()
-        results["processing_time"] = str(end_time - start_time)
+        elapsed = time.perf_counter() - start
+        results["processing_time"] = f"{elapsed:.3f}s"
         
         logging.info(f"✅ Confluence processing completed in {results['processing_time']}")
         
@@ -2,7 +2,12 @@
 
 import html
 import re
-from typing import Dict, List, Any
+from functools import lru_cache
+from typing import Dict, List, Any, Optional
+
+
+# Raw HTML prefix cleaned when looking for a child page's first sentence
+CHILD_DESCRIPTION_SNIPPET_CHARS = 2048
 
 
 class ContentProcessor:
@@ -92,7 +97,8 @@ class ContentProcessor:
         
         Args:
             content: Base content
-            children_data: List of child page data
+            children_data: List of child page data; an entry may carry a
+                precomputed "first_sentence" in place of its "content"
             level: Current nesting level
             page_title: Title of current page
             
@@ -118,13 +124,11 @@ class ContentProcessor:
             child_description = ""
             
             # Try to get a brief description from child content
-            child_content = child.get('content', '')
-            if child_content:
-                clean_child_content = ContentProcessor.clean_html_content(child_content)
-                # Get first sentence as description
-                first_sentence = clean_child_content.split('.')[0].strip()
-                if len(first_sentence) > 10 and len(first_sentence) < 100:
-                    child_description = f" - {first_sentence}"
+            first_sentence = child.get('first_sentence')
+            if first_sentence is None:
+                first_sentence = ContentProcessor._first_sentence(child.get('content') or '')
+            if len(first_sentence) > 10 and len(first_sentence) < 100:
+                child_description = f" - {first_sentence}"
             
             # Add child page entry with description
             content += f"{indent}- {child_title} (ID: {child_id}){child_description}\n"
@@ -137,6 +141,47 @@ class ContentProcessor:
         
         return content
     
+    @staticmethod
+    def _first_sentence(html_content: str) -> str:
+        """
+        Get the first sentence of cleaned HTML without cleaning the whole page.
+        
+        Only a tag-aligned prefix of the raw HTML is cleaned; the full page is
+        cleaned when that prefix ends before any sentence break or contains
+        Confluence macros, which may close beyond the cut.
+        """
+        # Cleaned text can never be longer than the raw HTML
+        if len(html_content) <= 10:
+            return ""
+        
+        cut = html_content.rfind('>', 0, CHILD_DESCRIPTION_SNIPPET_CHARS)
+        if len(html_content) > CHILD_DESCRIPTION_SNIPPET_CHARS and cut != -1:
+            snippet = html_content[:cut + 1]
+        else:
+            snippet = None
+        
+        if snippet and '<ac:' not in snippet:
+            first_sentence = ContentProcessor._snippet_first_sentence(snippet)
+            if first_sentence is not None:
+                return first_sentence
+        
+        return ContentProcessor.clean_html_content(html_content).split('.', 1)[0].strip()
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _snippet_first_sentence(snippet: str) -> Optional[str]:
+        """
+        First sentence of a page prefix, or None when the prefix cannot decide it.
+        
+        Every ancestor lists its descendants, so results are memoized; the key is
+        the bounded prefix, never the whole page body.
+        """
+        text = ContentProcessor.clean_html_content(snippet)
+        # A long unbroken prefix already rules out a short first sentence
+        if '.' in text or len(text) >= 100:
+            return text.split('.', 1)[0].strip()
+        return None
+    
     @staticmethod
     def add_labels_to_content(content: str, labels: List[str]) -> str:
         """Add page labels to content for better searchability."""
@@ -2,10 +2,21 @@
 
 import json
 import os
-from typing import Dict, List, Any, Tuple
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
 from .content import ContentProcessor
 
 
+# Below this many pages the process pool start-up costs more than it saves
+PARALLEL_CONVERT_THRESHOLD = 64
+
+
+def _iso(value: Any) -> Any:
+    """Render datetime-like values as ISO strings so documents stay plain JSON."""
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
 class RagProcessor:
     """Handles RAG-specific document formatting and output."""
     
@@ -41,28 +52,31 @@ class RagProcessor:
             confluence_data.get('labels', [])
         )
         
+        doc_id = "confluence_" + str(confluence_data.get('id', 'unknown'))
+        url = base_url + (confluence_data.get('url') or '')
+        
         if simplified:
             # Simplified format with minimal metadata for better RAG performance
             return {
-                "id": f"confluence_{confluence_data.get('id', 'unknown')}",
+                "id": doc_id,
                 "title": confluence_data.get('title', ''),
                 "content": enhanced_content,
-                "url": f"{base_url}{confluence_data.get('url', '')}"
+                "url": url
             }
         else:
             # Full format with extensive metadata
             return {
-                "id": f"confluence_{confluence_data.get('id', 'unknown')}",
+                "id": doc_id,
                 "title": confluence_data.get('title', ''),
                 "content": enhanced_content,
-                "url": f"{base_url}{confluence_data.get('url', '')}",
+                "url": url,
                 "metadata": {
                     "source": "confluence",
                     "space": confluence_data.get('space'),
                     "space_name": confluence_data.get('space_name'),
                     "page_id": confluence_data.get('id'),
                     "version": confluence_data.get('version'),
-                    "last_modified": confluence_data.get('last_modified'),
+                    "last_modified": _iso(confluence_data.get('last_modified')),
                     "author": confluence_data.get('author'),
                     "ancestors": confluence_data.get('ancestors', []),
                     "child_count": len(confluence_data.get('children', [])),
@@ -74,49 +88,125 @@ class RagProcessor:
     @staticmethod
     def flatten_confluence_tree(confluence_data: Dict[str, Any], 
                                base_url: str,
-                               simplified: bool = False) -> List[Tuple[str, Dict[str, Any]]]:
+                               simplified: bool = False,
+                               max_workers: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
         """
-        Recursively flatten Confluence content tree into individual page documents.
+        Flatten Confluence content tree into a list of individual page documents.
+        
+        Prefer iter_flatten_confluence_tree when the documents are only
+        written out, so they never need to be held in memory together.
         
         Args:
             confluence_data: Root Confluence page data
             base_url: Base URL for constructing full URLs
             simplified: Whether to use simplified format
+            max_workers: Process pool size (default: os.cpu_count())
             
         Returns:
             List of (page_id, rag_document) tuples
         """
-        documents = []
-        RagProcessor._flatten_tree_recursive(confluence_data, documents, base_url, simplified)
-        return documents
+        return list(RagProcessor.iter_flatten_confluence_tree(
+            confluence_data, base_url, simplified, max_workers
+        ))
     
     @staticmethod
-    def _flatten_tree_recursive(node: Dict[str, Any], 
-                               documents: List[Tuple[str, Dict[str, Any]]],
-                               base_url: str,
-                               simplified: bool = False):
-        """Recursive helper for flattening tree."""
-        if not node or node.get('error'):
+    def iter_flatten_confluence_tree(confluence_data: Dict[str, Any],
+                                     base_url: str,
+                                     simplified: bool = False,
+                                     max_workers: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Lazily flatten Confluence content tree into individual page documents.
+        
+        HTML cleaning is CPU-bound and independent per page, so large trees are
+        converted in a process pool; small trees, and single-worker pools, stay
+        sequential.
+        
+        Args:
+            confluence_data: Root Confluence page data
+            base_url: Base URL for constructing full URLs
+            simplified: Whether to use simplified format
+            max_workers: Process pool size (default: os.cpu_count())
+            
+        Yields:
+            (page_id, rag_document) tuples in depth-first order
+        """
+        nodes = RagProcessor._collect_nodes(confluence_data)
+        
+        # Bind the per-tree arguments once; the partial is also picklable for the pool
+        convert = partial(RagProcessor.convert_confluence_to_rag,
+                          base_url=base_url, simplified=simplified)
+        
+        # A node's document lists its whole subtree, but only reads each
+        # descendant's first sentence. Those are computed once per page and each
+        # node is converted with its descendants trimmed to id, title and that
+        # sentence, so no page is cleaned (or sent to a worker) once per ancestor.
+        listed = RagProcessor._collect_listed_children(confluence_data)
+        contents = [child.get('content') or '' for child in listed]
+        
+        workers = max_workers or os.cpu_count() or 1
+        if len(nodes) < PARALLEL_CONVERT_THRESHOLD or workers == 1:
+            first_sentences = {id(child): ContentProcessor._first_sentence(content)
+                               for child, content in zip(listed, contents)}
+            for node in nodes:
+                yield node.get('id', 'unknown'), convert(RagProcessor._trim_children(node, first_sentences))
             return
         
-        # Convert current page to RAG format
-        rag_doc = RagProcessor.convert_confluence_to_rag(node, base_url, simplified)
-        page_id = node.get('id', 'unknown')
-        documents.append((page_id, rag_doc))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            sentences = executor.map(ContentProcessor._first_sentence, contents, chunksize=32)
+            first_sentences = {id(child): sentence for child, sentence in zip(listed, sentences)}
+            payloads = [RagProcessor._trim_children(node, first_sentences) for node in nodes]
+            rag_docs = executor.map(convert, payloads, chunksize=32)
+            for node, rag_doc in zip(nodes, rag_docs):
+                yield node.get('id', 'unknown'), rag_doc
+    
+    @staticmethod
+    def _collect_nodes(root: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Walk the tree iteratively and return valid nodes in depth-first order."""
+        nodes = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if not node or node.get('error'):
+                continue
+            nodes.append(node)
+            # Reverse so children pop in their original order
+            stack.extend(reversed(node.get('children', [])))
+        return nodes
+    
+    @staticmethod
+    def _collect_listed_children(root: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return every entry of every children list in the tree, error pages included."""
+        listed = []
+        stack = list(root.get('children', []))
+        while stack:
+            child = stack.pop()
+            listed.append(child)
+            stack.extend(child.get('children') or ())
+        return listed
+    
+    @staticmethod
+    def _trim_children(node: Dict[str, Any], first_sentences: Dict[int, str]) -> Dict[str, Any]:
+        """Shallow copy of a node whose descendants keep only what the child listing reads."""
+        def trim(child: Dict[str, Any]) -> Dict[str, Any]:
+            entry = {key: child[key] for key in ('id', 'title') if key in child}
+            entry['first_sentence'] = first_sentences[id(child)]
+            if child.get('children'):
+                entry['children'] = [trim(grandchild) for grandchild in child['children']]
+            return entry
         
-        # Process children recursively
-        for child in node.get('children', []):
-            RagProcessor._flatten_tree_recursive(child, documents, base_url, simplified)
+        payload = dict(node)
+        payload['children'] = [trim(child) for child in node.get('children', [])]
+        return payload
     
     @staticmethod
-    def save_individual_jsonl_files(documents: List[Tuple[str, Dict[str, Any]]], 
+    def save_individual_jsonl_files(documents: Iterable[Tuple[str, Dict[str, Any]]], 
                                    base_filename: str,
                                    simplified: bool = False) -> int:
         """
         Save individual JSONL files per document.
         
         Args:
-            documents: List of (page_id, rag_document) tuples
+            documents: Iterable of (page_id, rag_document) tuples
             base_filename: Base filename for output directory
             simplified: Whether files are simplified format
             
@@ -133,26 +223,29 @@ class RagProcessor:
         for page_id, rag_doc in documents:
             page_filename = os.path.join(dir_name, f"confluence_{page_id}.jsonl")
             with open(page_filename, 'w', encoding='utf-8') as f:
-                f.write(json.dumps(rag_doc, ensure_ascii=False, default=str) + '\n')
+                f.write(json.dumps(rag_doc, ensure_ascii=False) + '\n')
             file_count += 1
         
         return file_count
     
     @staticmethod
-    def save_combined_jsonl(documents: List[Tuple[str, Dict[str, Any]]], 
+    def save_combined_jsonl(documents: Iterable[Tuple[str, Dict[str, Any]]], 
                            filename: str) -> int:
         """
-        Save all documents to a single JSONL file.
+        Save all documents to a single JSONL file as they are produced.
         
         Args:
-            documents: List of (page_id, rag_document) tuples
+            documents: Iterable of (page_id, rag_document) tuples
             filename: Output filename
             
         Returns:
             Number of documents saved
         """
-        with open(filename, 'w', encoding='utf-8') as f:
+        doc_count = 0
+        with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
             for page_id, rag_doc in documents:
-                f.write(json.dumps(rag_doc, ensure_ascii=False, default=str) + '\n')
+                f.write(json.dumps(rag_doc, ensure_ascii=False))
+                f.write('\n')
+                doc_count += 1
         
-        return len(documents)
\ No newline at end of file
+        return doc_count
@@ -6,10 +6,16 @@ Script to check overall space content and get broader statistics.
 import os
 import sys
 import json
+import base64
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
-from requests.auth import HTTPBasicAuth
+
+# Optional faster JSON decoding
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 def load_config():
     """Load configuration from .env file."""
@@ -23,18 +29,35 @@ def load_config():
         'api_token': os.getenv('JIRA_API_TOKEN')
     }
 
-def get_space_content_count(base_url, username, api_token, space_key="DW"):
+def create_session(username, api_token):
+    """Create a keep-alive session with the Basic auth header encoded once."""
+    credentials = base64.b64encode(f"{username}:{api_token}".encode()).decode()
+    session = requests.Session()
+    session.headers.update({
+        "Accept": "application/json",
+        "Authorization": f"Basic {credentials}"
+    })
+    return session
+
+def parse_json(response):
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
+            # Match response.json() so the RequestException handlers still apply
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+    return response.json()
+
+def get_space_content_count(session, base_url, space_key="DW"):
     """Get total count of pages in the DW space."""
-    auth = HTTPBasicAuth(username, api_token)
-    headers = {"Accept": "application/json"}
-    
     # Get space content with limit
     url = f"{base_url}/rest/api/content?spaceKey={space_key}&type=page&limit=1000"
     
     try:
-        response = requests.get(url, headers=headers, auth=auth)
+        response = session.get(url)
         response.raise_for_status()
-        data = response.json()
+        data = parse_json(response)
         
         total_size = data.get('size', 0)
         total_results = len(data.get('results', []))
@@ -54,18 +77,15 @@ def get_space_content_count(base_url, username, api_token, space_key="DW"):
         print(f"❌ Error fetching space content: {e}")
         return None
 
-def check_parent_child_relationships(base_url, username, api_token, root_page_id="3492511763"):
+def check_parent_child_relationships(session, base_url, root_page_id="3492511763"):
     """Check if there are other parent-child relationships we might be missing."""
-    auth = HTTPBasicAuth(username, api_token)
-    headers = {"Accept": "application/json"}
-    
     # Check if this page has any ancestors
     url = f"{base_url}/rest/api/content/{root_page_id}?expand=ancestors"
     
     try:
-        response = requests.get(url, headers=headers, auth=auth)
+        response = session.get(url)
         response.raise_for_status()
-        data = response.json()
+        data = parse_json(response)
         
         ancestors = data.get('ancestors', [])
         print(f"\n🔍 Page hierarchy for {root_page_id}:")
@@ -88,19 +108,14 @@ def main():
     
     print("🔍 Checking Confluence space content...")
     
+    # One session for both calls so the connection is reused
+    session = create_session(config['username'], config['api_token'])
+    
     # Get overall space statistics
-    space_data = get_space_content_count(
-        config['confluence_base_url'],
-        config['username'],
-        config['api_token']
-    )
+    space_data = get_space_content_count(session, config['confluence_base_url'])
     
     # Check parent-child relationships
-    hierarchy_data = check_parent_child_relationships(
-        config['confluence_base_url'],
-        config['username'],
-        config['api_token']
-    )
+    hierarchy_data = check_parent_child_relationships(session, config['confluence_base_url'])
     
     print("\n💡 Possible reasons for page count difference:")
     print("   1. Some pages might not be children of the root page")
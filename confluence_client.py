@@ -7,16 +7,151 @@ and recursive child page processing.
 
 import requests
 import logging
+import os
 import time
+import hashlib
+import shelve
+import dbm.dumb
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-from typing import Optional, Dict, List, Set, Any
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, List, Set, Any, Tuple
+from confluence_expand import RAG_EXPAND, SLIM_EXPAND, RAW_EXPAND
+
+# Optional faster JSON decoding for large page payloads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+__all__ = ["ConfluenceClient"]
+
+# (connect, read) timeout in seconds for every API call
+REQUEST_TIMEOUT = (5, 30)
+
+# Page size for the flat descendant listing used to discover a tree
+DESCENDANTS_PAGE_SIZE = 200
+
+# Page ids per CQL "id in (...)" query when fetching bodies in bulk
+BULK_FETCH_BATCH_SIZE = 100
+
+def parse_json(response: requests.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
+            # Match response.json() so callers' RequestException handlers still apply
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+    return response.json()
+
+
+class TokenBucket:
+    """Thread-safe token bucket that spaces out requests across threads."""
+    
+    def __init__(self, rate: Optional[float], burst: int):
+        """
+        Initialize the bucket.
+        
+        Args:
+            rate: Sustained requests per second (None for no limit)
+            burst: Requests allowed back-to-back when the bucket is full
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Take one token, sleeping (outside the lock) until it is available."""
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._blocked_until - now
+            if self.rate:
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                # Reserve the token now; a negative balance is the queue ahead of us
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait_time = max(wait_time, -self._tokens / self.rate)
+        if wait_time > 0:
+            time.sleep(wait_time)
+    
+    def penalize(self, seconds: float) -> None:
+        """Hold back all requests for the given number of seconds."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class PageCache:
+    """
+    Thread-safe on-disk cache of parsed pages, keyed by page ID and version.
+    
+    Label and restriction edits do not bump a page's version, so cached
+    entries can lag behind on those fields until the page itself changes.
+    """
+    
+    def __init__(self, cache_dir: str, base_url: str, name: str = "pages"):
+        """
+        Open (or create) the cache bucket for one Confluence site.
+        
+        Args:
+            cache_dir: Directory holding the cache files
+            base_url: Confluence base URL; each site gets its own bucket
+            name: File name prefix, so clients with different page formats
+                do not share a bucket
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        bucket = hashlib.sha1(base_url.encode("utf-8")).hexdigest()[:12]
+        # dbm.dumb can be used from any thread; the sqlite3 backend that
+        # shelve.open picks on Python 3.13+ is bound to the opening thread
+        self._shelf = shelve.Shelf(dbm.dumb.open(os.path.join(cache_dir, f"{name}_{bucket}"), "c"))
+        self._lock = threading.Lock()
+    
+    def get(self, page_id: str, version: Optional[int],
+            include_metadata: bool = True) -> Optional[Dict[str, Any]]:
+        """Return the cached page if it is at the given version (and complete enough), else None."""
+        if version is None:
+            return None
+        entry = self.get_entry(page_id)
+        if entry and entry["version"] == version and (entry.get("metadata", True) or not include_metadata):
+            return entry["page"]
+        return None
+    
+    def put(self, page_id: str, page: Dict[str, Any], include_metadata: bool = True) -> None:
+        """Store a successfully parsed page under its version."""
+        if page.get("version") is None or "error" in page:
+            return
+        self.put_entry(page_id, {"version": page["version"], "page": page, "metadata": include_metadata})
+    
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the raw stored entry for a key, or None."""
+        with self._lock:
+            return self._shelf.get(key)
+    
+    def put_entry(self, key: str, entry: Dict[str, Any]) -> None:
+        """Store a raw entry under a key."""
+        with self._lock:
+            self._shelf[key] = entry
+    
+    def close(self) -> None:
+        """Flush and close the cache file."""
+        with self._lock:
+            self._shelf.close()
+
 
 class ConfluenceClient:
     """Client for interacting with Confluence REST API."""
     
     def __init__(self, base_url: str, username: str, api_token: str, 
-                 max_concurrent_calls: int = 5, api_call_delay: float = 0.1):
+                 max_concurrent_calls: int = 5, api_call_delay: float = 0.1,
+                 cache_dir: Optional[str] = None):
         """
         Initialize Confluence client.
         
@@ -24,19 +159,88 @@ class ConfluenceClient:
             base_url: Confluence base URL (e.g., "https://domain.atlassian.net/wiki")
             username: Confluence username/email
             api_token: Confluence API token
-            max_concurrent_calls: Maximum concurrent API calls
-            api_call_delay: Delay between API calls in seconds
+            max_concurrent_calls: Maximum concurrent API calls; also sizes the
+                worker pool and the keep-alive connection pool
+            api_call_delay: Minimum average spacing per concurrent slot, in seconds;
+                the client sustains at most max_concurrent_calls / api_call_delay
+                requests per second without delaying requests when idle
+            cache_dir: Directory for an on-disk page cache keyed by (id, version);
+                unchanged pages are then served from disk after a version check
         """
         self.base_url = base_url.rstrip('/')
         self.username = username
         self.api_token = api_token
         self.api_call_delay = api_call_delay
+        
+        # URL templates built once per client; call sites only fill in IDs
+        content_url = f"{self.base_url}/rest/api/content"
+        self._raw_page_url_tmpl = content_url + "/{page_id}?expand=" + RAW_EXPAND
+        self._page_url_tmpl = content_url + "/{page_id}?expand=" + RAG_EXPAND
+        self._slim_page_url_tmpl = content_url + "/{page_id}?expand=" + SLIM_EXPAND
+        self._version_url_tmpl = content_url + "/{page_id}?expand=version"
+        self._children_url_tmpl = content_url + "/{page_id}/child/page?start={start}&limit={limit}"
+        self._descendants_url_tmpl = content_url + "/{page_id}/descendant/page"
+        self._search_url = content_url + "/search"
         self.auth = HTTPBasicAuth(username, api_token)
         self.headers = {"Accept": "application/json"}
         self.semaphore = threading.Semaphore(max_concurrent_calls)
+        rate = max_concurrent_calls / api_call_delay if api_call_delay > 0 else None
+        self.rate_limiter = TokenBucket(rate, burst=max_concurrent_calls)
+        self.cache = PageCache(cache_dir, self.base_url) if cache_dir else None
+        
+        # One pooled keep-alive session so recursive crawls reuse TLS connections
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.session.headers.update(self.headers)
+        # Storage-format bodies are verbose XHTML; ask for every compression
+        # urllib3 can decode here (brotli is added when the package is installed)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self._encoding_logged = False
+        # Transient failures are retried here with exponential backoff (honoring
+        # Retry-After); only terminal errors reach the except blocks below
+        retries = Retry(total=5, backoff_factor=0.5,
+                        status_forcelist=(429, 500, 502, 503, 504),
+                        allowed_methods=frozenset(["GET"]),
+                        respect_retry_after_header=True, raise_on_status=False)
+        # Every request runs under the semaphore, so max_concurrent_calls sockets
+        # cover all in-flight calls; pool_block makes any excess wait for a free
+        # keep-alive socket instead of opening and discarding a new one
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrent_calls,
+                              pool_block=True, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.hooks["response"].append(self._on_response)
+        
+        # Workers for the parallel tree crawl, matching the semaphore width
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_calls,
+                                           thread_name_prefix="confluence")
         
         logging.debug(f"Initialized Confluence client for {base_url}")
     
+    def _on_response(self, response: requests.Response, *args, **kwargs) -> None:
+        """Back off every thread when the server still answers 429 after retries."""
+        if not self._encoding_logged:
+            self._encoding_logged = True
+            logging.debug(f"Confluence response Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}")
+        if response.status_code == 429:
+            try:
+                self.rate_limiter.penalize(float(response.headers.get("Retry-After", "")))
+            except ValueError:
+                pass
+    
+    def close(self) -> None:
+        """Shut down the crawl workers, the pooled HTTP session and the page cache."""
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+    
+    def __enter__(self) -> "ConfluenceClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
     def fetch_page_content_raw(self, page_id: str) -> Optional[Dict[str, Any]]:
         """
         Fetch RAW content of a Confluence page with ALL fields for debugging.
@@ -47,15 +251,15 @@ class ConfluenceClient:
         Returns:
             Raw dictionary with ALL page data from API
         """
-        url = f"{self.base_url}/rest/api/content/{page_id}?expand=body,space,version,metadata,history,ancestors,restrictions,container,extensions,children,descendants,operations,status"
+        url = self._raw_page_url_tmpl.format(page_id=page_id)
         
-        logging.info(f"Fetching RAW Confluence page data: {page_id}")
+        logging.info("Fetching RAW Confluence page data: %s", page_id)
+        self.rate_limiter.acquire()
         self.semaphore.acquire()
         try:
-            time.sleep(self.api_call_delay)
-            response = requests.get(url, headers=self.headers, auth=self.auth)
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            page_data = response.json()
+            page_data = parse_json(response)
             return page_data  # Return everything raw
         except requests.exceptions.RequestException as e:
             logging.error(f"Error fetching RAW Confluence page {page_id}: {e}")
@@ -63,80 +267,151 @@ class ConfluenceClient:
         finally:
             self.semaphore.release()
 
-    def fetch_page_content(self, page_id: str) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _parse_page(page_data: Dict[str, Any], include_metadata: bool = True) -> Dict[str, Any]:
+        """
+        Extract the fields used by the exporters from a raw content payload.
+        
+        Args:
+            page_data: Content object as returned by the REST API
+            include_metadata: Whether to normalize labels, ancestors, restrictions
+                and history; when False only content-level fields are returned
+            
+        Returns:
+            Dictionary with page data
+        """
+        space_info = page_data.get("space") or {}
+        if not include_metadata:
+            return {
+                "title": page_data.get("title"),
+                "url": (page_data.get("_links") or {}).get("webui"),
+                "content": ((page_data.get("body") or {}).get("storage") or {}).get("value"),
+                "space": space_info.get("key"),
+                "space_name": space_info.get("name", ""),
+                "version": (page_data.get("version") or {}).get("number")
+            }
+        
+        # Extract labels
+        labels = []
+        metadata = page_data.get("metadata") or {}
+        if "labels" in metadata:
+            labels = [label.get("name", "") for label in (metadata["labels"] or {}).get("results") or ()]
+            logging.info("Extracted labels for page %s: %s", page_data.get("id"), labels)
+        
+        # Extract ancestors for breadcrumb info
+        ancestors = [
+            {"id": ancestor.get("id"), "title": ancestor.get("title"), "type": ancestor.get("type")}
+            for ancestor in page_data.get("ancestors") or ()
+        ]
+        
+        # Extract restrictions/permissions
+        restrictions = page_data.get("restrictions") or {}
+        read_users, read_groups = ConfluenceClient._extract_people(restrictions.get("read"))
+        update_users, update_groups = ConfluenceClient._extract_people(restrictions.get("update"))
+        
+        permissions = {
+            "read_restrictions": {"users": read_users, "groups": read_groups},
+            "update_restrictions": {"users": update_users, "groups": update_groups},
+            "is_restricted": bool(read_users or read_groups)
+        }
+        
+        # Extract history metadata
+        history = page_data.get("history") or {}
+        last_updated = history.get("lastUpdated") or {}
+        
+        return {
+            "title": page_data.get("title"),
+            "url": (page_data.get("_links") or {}).get("webui"),
+            "content": ((page_data.get("body") or {}).get("storage") or {}).get("value"),
+            "space": space_info.get("key"),
+            "space_name": space_info.get("name", ""),
+            "version": (page_data.get("version") or {}).get("number"),
+            "labels": labels,
+            "ancestors": ancestors,
+            "permissions": permissions,
+            "created_date": history.get("createdDate"),
+            "last_modified": last_updated.get("when"),
+            "author": (last_updated.get("by") or {}).get("displayName")
+        }
+    
+    @staticmethod
+    def _extract_people(operation: Optional[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+        """
+        Extract user and group names from one restriction operation.
+        
+        Args:
+            operation: The "read" or "update" entry of the restrictions expansion
+            
+        Returns:
+            Tuple of (user display names, group names)
+        """
+        people = (operation or {}).get("restrictions") or {}
+        users = (people.get("user") or {}).get("results") or ()
+        groups = (people.get("group") or {}).get("results") or ()
+        return [user.get("displayName", "") for user in users], [group.get("name", "") for group in groups]
+
+    def fetch_page_content(self, page_id: str, *, include_metadata: bool = True) -> Optional[Dict[str, Any]]:
         """
         Fetch content of a Confluence page.
         
+        With a page cache configured, a version-only probe decides whether the
+        cached copy can be returned instead of downloading the page again.
+        
         Args:
             page_id: Confluence page ID
+            include_metadata: Whether to fetch and normalize labels, ancestors,
+                restrictions and history (False fetches content fields only)
             
         Returns:
             Dictionary with page data or error information
         """
-        url = f"{self.base_url}/rest/api/content/{page_id}?expand=body.storage,body.view,body.export_view,space,version,metadata.labels,metadata.properties,history.lastUpdated,ancestors,restrictions.read,restrictions.update,extensions"
+        if self.cache is not None:
+            cached = self.cache.get(page_id, self.fetch_page_version(page_id), include_metadata)
+            if cached is not None:
+                return cached
         
-        logging.debug(f"Fetching Confluence page: {page_id}")
+        page = self._fetch_page_content(page_id, include_metadata)
+        if self.cache is not None:
+            self.cache.put(page_id, page, include_metadata)
+        return page
+    
+    def fetch_page_version(self, page_id: str) -> Optional[int]:
+        """
+        Fetch only the current version number of a page (a ~1 KB response).
+        
+        Args:
+            page_id: Confluence page ID
+            
+        Returns:
+            Version number, or None if it could not be fetched
+        """
+        url = self._version_url_tmpl.format(page_id=page_id)
+        
+        self.rate_limiter.acquire()
         self.semaphore.acquire()
         try:
-            time.sleep(self.api_call_delay)
-            response = requests.get(url, headers=self.headers, auth=self.auth)
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            page_data = response.json()
-            # Extract labels
-            labels = []
-            metadata = page_data.get("metadata", {})
-            if "labels" in metadata:
-                labels = [label.get("name", "") for label in metadata.get("labels", {}).get("results", [])]
-                logging.info(f"Extracted labels for page {page_id}: {labels}")
-            
-            # Extract ancestors for breadcrumb info
-            ancestors = []
-            for ancestor in page_data.get("ancestors", []):
-                ancestors.append({
-                    "id": ancestor.get("id"),
-                    "title": ancestor.get("title"),
-                    "type": ancestor.get("type")
-                })
-            
-            # Extract restrictions/permissions
-            restrictions = page_data.get("restrictions", {})
-            read_restrictions = restrictions.get("read", {}).get("restrictions", {})
-            update_restrictions = restrictions.get("update", {}).get("restrictions", {})
-            
-            permissions = {
-                "read_restrictions": {
-                    "users": [user.get("displayName", "") for user in read_restrictions.get("user", {}).get("results", [])],
-                    "groups": [group.get("name", "") for group in read_restrictions.get("group", {}).get("results", [])]
-                },
-                "update_restrictions": {
-                    "users": [user.get("displayName", "") for user in update_restrictions.get("user", {}).get("results", [])],
-                    "groups": [group.get("name", "") for group in update_restrictions.get("group", {}).get("results", [])]
-                },
-                "is_restricted": len(read_restrictions.get("user", {}).get("results", [])) > 0 or len(read_restrictions.get("group", {}).get("results", [])) > 0
-            }
-            
-            # Extract space name and other metadata
-            space_info = page_data.get("space", {})
-            space_name = space_info.get("name", "")
-            
-            # Extract last modified info
-            history = page_data.get("history", {})
-            last_updated = history.get("lastUpdated", {})
-            
-            return {
-                "title": page_data.get("title"),
-                "url": page_data.get("_links", {}).get("webui"),
-                "content": page_data.get("body", {}).get("storage", {}).get("value"),
-                "space": space_info.get("key"),
-                "space_name": space_name,
-                "version": page_data.get("version", {}).get("number"),
-                "labels": labels,
-                "ancestors": ancestors,
-                "permissions": permissions,
-                "created_date": page_data.get("history", {}).get("createdDate"),
-                "last_modified": last_updated.get("when"),
-                "author": last_updated.get("by", {}).get("displayName")
-            }
+            return parse_json(response).get("version", {}).get("number")
+        except requests.exceptions.RequestException as e:
+            logging.debug("Could not fetch version of Confluence page %s: %s", page_id, e)
+            return None
+        finally:
+            self.semaphore.release()
+    
+    def _fetch_page_content(self, page_id: str, include_metadata: bool = True) -> Optional[Dict[str, Any]]:
+        """Fetch and parse one page, bypassing the cache."""
+        url_tmpl = self._page_url_tmpl if include_metadata else self._slim_page_url_tmpl
+        url = url_tmpl.format(page_id=page_id)
+        
+        logging.debug("Fetching Confluence page: %s", page_id)
+        self.rate_limiter.acquire()
+        self.semaphore.acquire()
+        try:
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            page_data = parse_json(response)
+            return self._parse_page(page_data, include_metadata)
         except requests.exceptions.RequestException as e:
             logging.error(f"Error fetching Confluence page {page_id}: {e}")
             error_details = {"error": str(e), "id": page_id}
@@ -150,12 +425,79 @@ class ConfluenceClient:
         finally:
             self.semaphore.release()
     
-    def fetch_child_pages(self, page_id: str) -> List[Dict[str, Any]]:
+    def _fetch_page_batch(self, page_ids: List[str], include_metadata: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch one batch of pages with a single CQL search (following pagination).
+        
+        Args:
+            page_ids: Up to BULK_FETCH_BATCH_SIZE page IDs
+            include_metadata: Whether to fetch and normalize page metadata
+            
+        Returns:
+            Dictionary mapping page ID to parsed page data; failed batches are empty
+        """
+        url = self._search_url
+        cql = f"id in ({','.join(page_ids)})"
+        expand = RAG_EXPAND if include_metadata else SLIM_EXPAND
+        pages = {}
+        start = 0
+        
+        while True:
+            params = {"cql": cql, "expand": expand, "start": start, "limit": BULK_FETCH_BATCH_SIZE}
+            self.rate_limiter.acquire()
+            self.semaphore.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                results = parse_json(response).get("results", [])
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Error bulk fetching {len(page_ids)} Confluence pages: {e}")
+                break
+            finally:
+                self.semaphore.release()
+            
+            for page_data in results:
+                pages[str(page_data.get("id"))] = self._parse_page(page_data, include_metadata)
+            
+            # The server may cap the page size below our limit when bodies are expanded
+            start += len(results)
+            if not results or start >= len(page_ids):
+                break
+        
+        return pages
+    
+    def fetch_pages_bulk(self, page_ids: List[str], include_metadata: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch many pages with ceil(N / BULK_FETCH_BATCH_SIZE) CQL searches.
+        
+        Pages missing from the result (deleted, restricted, or in a failed
+        batch) are simply absent; use fetch_page_content for their details.
+        
+        Args:
+            page_ids: Confluence page IDs
+            include_metadata: Whether to fetch and normalize page metadata
+            
+        Returns:
+            Dictionary mapping page ID to the same data fetch_page_content returns
+        """
+        batches = [page_ids[i:i + BULK_FETCH_BATCH_SIZE]
+                   for i in range(0, len(page_ids), BULK_FETCH_BATCH_SIZE)]
+        pages = {}
+        fetch_batch = partial(self._fetch_page_batch, include_metadata=include_metadata)
+        for batch_pages in self.executor.map(fetch_batch, batches):
+            pages.update(batch_pages)
+        
+        logging.info(f"Bulk fetched {len(pages)}/{len(page_ids)} Confluence pages in {len(batches)} requests")
+        return pages
+    
+    def fetch_child_pages(self, page_id: str, with_child_flags: bool = False) -> List[Dict[str, Any]]:
         """
         Fetch child pages of a Confluence page with pagination support.
         
         Args:
             page_id: Parent page ID
+            with_child_flags: Also expand each child's own children so every
+                summary carries "has_children" (None if the server omitted it)
             
         Returns:
             List of child page summaries
@@ -164,17 +506,19 @@ class ConfluenceClient:
         start = 0
         limit = 100  # Increased from default 25 to reduce API calls
         
-        logging.debug(f"Fetching Confluence child pages for: {page_id}")
+        logging.debug("Fetching Confluence child pages for: %s", page_id)
         
         while True:
-            url = f"{self.base_url}/rest/api/content/{page_id}/child/page?start={start}&limit={limit}"
+            url = self._children_url_tmpl.format(page_id=page_id, start=start, limit=limit)
+            if with_child_flags:
+                url += "&expand=children.page"
             
+            self.rate_limiter.acquire()
             self.semaphore.acquire()
             try:
-                time.sleep(self.api_call_delay)
-                response = requests.get(url, headers=self.headers, auth=self.auth)
+                response = self.session.get(url, timeout=REQUEST_TIMEOUT)
                 response.raise_for_status()
-                children_data = response.json()
+                children_data = parse_json(response)
                 
                 results = children_data.get("results", [])
                 if not results:
@@ -182,11 +526,15 @@ class ConfluenceClient:
                     break
                 
                 for child in results:
-                    child_pages_summary.append({
+                    summary = {
                         "id": child.get("id"),
                         "title": child.get("title"),
                         "url": child.get("_links", {}).get("webui")
-                    })
+                    }
+                    if with_child_flags:
+                        grandchildren = (child.get("children") or {}).get("page")
+                        summary["has_children"] = bool(grandchildren.get("results")) if grandchildren else None
+                    child_pages_summary.append(summary)
                 
                 # Check if we got fewer results than requested (last page)
                 if len(results) < limit:
@@ -206,32 +554,160 @@ class ConfluenceClient:
         
         return child_pages_summary
     
-    def fetch_content_recursive(self, page_id: str, visited_pages: Optional[Set[str]] = None) -> Optional[Dict[str, Any]]:
+    def fetch_all_descendants(self, root_id: str) -> Optional[List[Dict[str, Any]]]:
         """
-        Fetch a Confluence page's content and recursively fetch its children.
-        Keeps track of visited pages to avoid infinite loops.
+        Fetch every descendant page of a root in one flat, paginated listing.
         
         Args:
-            page_id: Page ID to fetch
-            visited_pages: Set of already visited page IDs (for cycle detection)
+            root_id: Root page ID
             
         Returns:
-            Dictionary with page content and children, or None if error
+            List of {"id", "title", "parent_id", "position", "version"} summaries,
+            or None if the listing failed
+        """
+        url = self._descendants_url_tmpl.format(page_id=root_id)
+        descendants = []
+        start = 0
+        
+        logging.debug(f"Fetching all Confluence descendants of: {root_id}")
+        
+        while True:
+            params = {"expand": "ancestors,extensions,version", "start": start, "limit": DESCENDANTS_PAGE_SIZE}
+            self.rate_limiter.acquire()
+            self.semaphore.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                data = parse_json(response)
+            except requests.exceptions.RequestException as e:
+                logging.warning(f"Error fetching descendants of Confluence page {root_id}: {e}")
+                return None
+            finally:
+                self.semaphore.release()
+            
+            results = data.get("results", [])
+            for page in results:
+                ancestors = page.get("ancestors") or []
+                descendants.append({
+                    "id": page.get("id"),
+                    "title": page.get("title"),
+                    "parent_id": ancestors[-1].get("id") if ancestors else None,
+                    "position": (page.get("extensions") or {}).get("position"),
+                    "version": (page.get("version") or {}).get("number")
+                })
+            
+            # The server reports the page size it actually used
+            if len(results) < data.get("limit", DESCENDANTS_PAGE_SIZE) or not results:
+                break
+            start += len(results)
+        
+        logging.info(f"Found {len(descendants)} descendants for Confluence page {root_id}")
+        return descendants
+    
+    @staticmethod
+    def _claim_page(visited_pages: Set[str], page_id: str) -> bool:
+        """
+        Mark a page as visited, returning False if it already was.
+        
+        Only the thread driving fetch_content_recursive calls this; pool
+        workers never see visited_pages, so no lock is needed.
         """
-        if visited_pages is None:
-            visited_pages = set()
-
         if page_id in visited_pages:
-            logging.debug(f"Skipping already visited Confluence page: {page_id}")
+            logging.debug("Skipping already visited Confluence page: %s", page_id)
+            return False
+        visited_pages.add(page_id)
+        return True
+    
+    def _discover_by_descendants(self, page_id: str,
+                                 visited_pages: Set[str]) -> Optional[Tuple[List[str], Dict[str, List[str]], Dict[str, int]]]:
+        """
+        Rebuild the page tree under page_id from a single descendant listing.
+        
+        Returns:
+            (page_ids, child_ids by parent, known versions by page ID),
+            or None if the listing failed
+        """
+        descendants = self.fetch_all_descendants(page_id)
+        if descendants is None:
             return None
         
-        visited_pages.add(page_id)
-
-        page_content_data = self.fetch_page_content(page_id)
+        children_of = {}
+        for summary in descendants:
+            children_of.setdefault(summary["parent_id"], []).append(summary)
+        
+        # Keep siblings in page-tree order when the server reports positions
+        for siblings in children_of.values():
+            if all(isinstance(child["position"], int) for child in siblings):
+                siblings.sort(key=lambda child: child["position"])
+        
+        page_ids = [page_id]
+        child_ids = {}
+        versions = {}
+        for current_id in page_ids:
+            child_ids[current_id] = []
+            for child_summary in children_of.get(current_id, []):
+                child_id = child_summary["id"]
+                if not child_id or not self._claim_page(visited_pages, child_id):
+                    continue
+                child_ids[current_id].append(child_id)
+                page_ids.append(child_id)
+                if child_summary["version"] is not None:
+                    versions[child_id] = child_summary["version"]
+        
+        return page_ids, child_ids, versions
+    
+    def _discover_by_listing(self, page_id: str,
+                             visited_pages: Set[str]) -> Tuple[List[str], Dict[str, List[str]], Dict[str, int]]:
+        """
+        Discover the page tree under page_id breadth-first from child listings.
+        
+        Each listing also reports whether every child has children of its
+        own, so leaf pages (most of a typical tree) are never listed.
+        
+        Returns:
+            (page_ids, child_ids by parent, known versions by page ID)
+        """
+        page_ids = [page_id]
+        child_ids = {}
+        pending = {self.executor.submit(self.fetch_child_pages, page_id, True): page_id}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                current_id = pending.pop(future)
+                child_pages_summary = future.result()
+                child_ids[current_id] = []
+                if child_pages_summary:
+                    logging.info("  Found %d children for Confluence page %s", len(child_pages_summary), current_id)
+                for child_summary in child_pages_summary:
+                    child_id = child_summary.get("id")
+                    if not child_id or not self._claim_page(visited_pages, child_id):
+                        continue
+                    logging.info("    Found child Confluence page: %s (%s)...", child_id, child_summary.get("title"))
+                    child_ids[current_id].append(child_id)
+                    page_ids.append(child_id)
+                    if child_summary.get("has_children") is False:
+                        child_ids[child_id] = []
+                        continue
+                    pending[self.executor.submit(self.fetch_child_pages, child_id, True)] = child_id
+        
+        return page_ids, child_ids, {}
+    
+    @staticmethod
+    def _build_node(page_id: str, page_content_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build a tree node from fetched page content.
+        
+        Args:
+            page_id: Page ID the content belongs to
+            page_content_data: Result of fetch_page_content
+            
+        Returns:
+            Page node with an empty children list, or an error node
+        """
         if not page_content_data or "error" in page_content_data:
             return {"id": page_id, "error": page_content_data.get("error", "Failed to fetch content")}
 
-        fetched_data = {
+        return {
             "id": page_id,
             "title": page_content_data.get("title"),
             "url": page_content_data.get("url"),
@@ -247,19 +723,96 @@ class ConfluenceClient:
             "author": page_content_data.get("author"),
             "children": []
         }
+    
+    def _load_cached_pages(self, page_ids: List[str], versions: Dict[str, int],
+                           include_metadata: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Return cached pages whose version still matches the server.
+        
+        Args:
+            page_ids: Pages in the tree
+            versions: Versions already known from discovery; the rest are probed
+            include_metadata: Whether cached entries must carry page metadata
+            
+        Returns:
+            Dictionary mapping page ID to cached page data
+        """
+        if self.cache is None:
+            return {}
+        
+        versions = dict(versions)
+        unknown = [pid for pid in page_ids if pid not in versions]
+        for pid, version in zip(unknown, self.executor.map(self.fetch_page_version, unknown)):
+            versions[pid] = version
+        
+        cached = {}
+        for pid in page_ids:
+            page = self.cache.get(pid, versions.get(pid), include_metadata)
+            if page is not None:
+                cached[pid] = page
+        
+        if cached:
+            logging.info(f"Reusing {len(cached)}/{len(page_ids)} cached Confluence pages")
+        return cached
+    
+    def fetch_content_recursive(self, page_id: str, visited_pages: Optional[Set[str]] = None,
+                                include_metadata: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a Confluence page's content and recursively fetch its children.
+        Keeps track of visited pages to avoid infinite loops.
+        
+        Runs in two phases: the page tree is rebuilt from one paginated
+        descendant listing (falling back to per-page child listings on the
+        worker pool), then all page bodies are fetched in bulk and stitched
+        into the tree.
+        
+        Args:
+            page_id: Page ID to fetch
+            visited_pages: Set of already visited page IDs (for cycle detection);
+                only read and updated by the calling thread
+            include_metadata: Whether to fetch labels, ancestors, permissions and
+                history for every page; False is cheaper for content-only exports
+            
+        Returns:
+            Dictionary with page content and children, or None if error
+        """
+        if visited_pages is None:
+            visited_pages = set()
 
-        child_pages_summary = self.fetch_child_pages(page_id)
-        if child_pages_summary:
-            logging.info(f"  Found {len(child_pages_summary)} children for Confluence page {page_id} ({page_content_data.get('title')})")
-            for child_summary in child_pages_summary:
-                child_id = child_summary.get("id")
-                if child_id:
-                    logging.info(f"    Fetching child Confluence page: {child_id} ({child_summary.get('title')})...")
-                    child_full_content = self.fetch_content_recursive(child_id, visited_pages)
-                    if child_full_content:
-                        fetched_data["children"].append(child_full_content)
-        
-        return fetched_data
+        if not self._claim_page(visited_pages, page_id):
+            return None
+        
+        # Phase 1: discover the tree, preferring one flat descendant listing
+        discovered = self._discover_by_descendants(page_id, visited_pages)
+        if discovered is None:
+            discovered = self._discover_by_listing(page_id, visited_pages)
+        page_ids, child_ids, versions = discovered
+        
+        # Phase 2: reuse cached pages that are still current, fetch the rest in
+        # bulk, and fall back to single fetches for anything the search did not
+        # return so errors keep their details
+        contents = self._load_cached_pages(page_ids, versions, include_metadata)
+        to_fetch = [pid for pid in page_ids if pid not in contents]
+        if to_fetch:
+            fetched = self.fetch_pages_bulk(to_fetch, include_metadata)
+            if self.cache is not None:
+                for pid, page_content_data in fetched.items():
+                    self.cache.put(pid, page_content_data, include_metadata)
+            contents.update(fetched)
+        missing = [pid for pid in page_ids if pid not in contents]
+        fetch_single = partial(self._fetch_page_content, include_metadata=include_metadata)
+        for pid, page_content_data in zip(missing, self.executor.map(fetch_single, missing)):
+            contents[pid] = page_content_data
+        
+        nodes = {pid: self._build_node(pid, contents[pid]) for pid in page_ids}
+        
+        # Stitch the tree together in the order the children were listed;
+        # pages that failed to fetch keep no children, as before
+        for current_id, ids in child_ids.items():
+            if ids and "error" not in nodes[current_id]:
+                nodes[current_id]["children"] = [nodes[child_id] for child_id in ids]
+        
+        return nodes[page_id]
 
     @staticmethod
     def extract_page_id_from_url(url: str) -> Optional[str]:
@@ -272,24 +825,19 @@ class ConfluenceClient:
         Returns:
             Page ID string or None if not found
         """
-        page_id = None
         if "?pageId=" in url:
-            try:
-                page_id = url.split('?pageId=')[1].split('&')[0]
-            except IndexError:
-                logging.warning(f"Could not parse pageId from URL: {url}")
-        elif "/pages/" in url:
-            parts = url.split('/pages/')
-            if len(parts) > 1:
-                page_id_part = parts[1].split('/')[0]
-                if page_id_part.isdigit():
-                    page_id = page_id_part
-                else:
-                    logging.warning(f"Non-numeric page ID segment: {page_id_part} in URL: {url}")
-            else:
-                logging.warning(f"Could not parse pageId from Confluence URL structure: {url}")
-        
-        return page_id
+            # Value runs up to the next parameter (or a repeated "?pageId=")
+            value = url.partition("?pageId=")[2]
+            return value.partition("?pageId=")[0].partition("&")[0]
+        
+        if "/pages/" in url:
+            # Segment ends at the next "/", or at a query/fragment when there is no trailing slash
+            page_id_part = url.partition("/pages/")[2].partition("/")[0].partition("?")[0].partition("#")[0]
+            if page_id_part.isdigit():
+                return page_id_part
+            logging.warning(f"Non-numeric page ID segment: {page_id_part} in URL: {url}")
+        
+        return None
 
     @staticmethod
     def is_confluence_url(url: str) -> bool:
@@ -302,6 +850,5 @@ class ConfluenceClient:
         Returns:
             True if URL appears to be a Confluence URL
         """
-        return ("atlassian.net/wiki/spaces/" in url or 
-                "/wiki/pages/" in url or 
-                "/wiki/spaces/" in url)
\ No newline at end of file
+        # "atlassian.net/wiki/spaces/" URLs are already matched by "/wiki/spaces/"
+        return "/wiki/spaces/" in url or "/wiki/pages/" in url
\ No newline at end of file
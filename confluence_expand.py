@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Shared expand parameter sets for Confluence REST content requests.
+Every client and debug script builds its content URLs from these, so the
+fields requested per page are defined in one place.
+"""
+
+# Minimum set the RAG pipeline reads: storage body, labels, history,
+# ancestors and restrictions (update restrictions end up in the exported permissions)
+RAG_EXPAND = "body.storage,space,version,metadata.labels,history.lastUpdated,ancestors,restrictions.read,restrictions.update"
+
+# RAG fields plus the sibling position needed to rebuild tree order from a search
+RAG_SEARCH_EXPAND = f"{RAG_EXPAND},extensions"
+
+# Content-only fetches skip the labels/ancestors/restrictions/history expansions
+SLIM_EXPAND = "body.storage,space,version"
+
+# Content-only fields plus what is needed to rebuild tree order from a search
+SLIM_SEARCH_EXPAND = f"{SLIM_EXPAND},ancestors,extensions"
+
+# Top-level expansions only, for a quick look at which fields exist
+RAW_EXPAND = "body,space,version,metadata,history,ancestors,restrictions,container,extensions,children,descendants,operations,status"
+
+# Every individually addressable field, for debugging field availability
+DEBUG_EXPAND_FULL = "body.storage,body.view,body.export_view,body.styled_view,body.atlas_doc_format,body.editor,body.editor2,body.dynamic,body.anonymous_export_view,space,version,metadata.labels,metadata.properties,metadata.frontend,metadata.simple,metadata.comments,history,ancestors,restrictions.read,restrictions.update,extensions,children,descendants,operations,status"
@@ -11,6 +11,12 @@ from datetime import datetime
 from dotenv import load_dotenv
 from confluence_client import ConfluenceClient
 
+# Optional faster JSON encoding
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Set up detailed logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -31,19 +37,53 @@ def load_config():
 
 def count_pages_with_details(data, level=0):
     """Count pages and show details about each."""
-    indent = "  " * level
-    title = data.get('title', 'Unknown Title')
-    page_id = data.get('id', 'Unknown ID')
-    children = data.get('children', [])
-    
-    print(f"{indent}📄 {title} (ID: {page_id}) - {len(children)} direct children")
-    
-    total_count = 1
-    for child in children:
-        total_count += count_pages_with_details(child, level + 1)
+    total_count = 0
+    stack = [(data, level)]
+    while stack:
+        node, depth = stack.pop()
+        indent = "  " * depth
+        title = node.get('title', 'Unknown Title')
+        page_id = node.get('id', 'Unknown ID')
+        children = node.get('children', [])
+        
+        print(f"{indent}📄 {title} (ID: {page_id}) - {len(children)} direct children")
+        
+        total_count += 1
+        # Reverse so children print in their original order
+        stack.extend((child, depth + 1) for child in reversed(children))
     
     return total_count
 
+def dumps_compact(obj):
+    """Encode one JSON value, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+def write_tree_streaming(f, root):
+    """Write a page tree as JSON one page at a time instead of encoding it whole."""
+    # Stack holds pages still to write and literal separators/closers
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            f.write(item)
+            continue
+        
+        fields = {key: value for key, value in item.items() if key != 'children'}
+        encoded = dumps_compact(fields)
+        if 'children' not in item:
+            f.write(encoded)
+            continue
+        
+        children = item['children']
+        f.write(encoded[:-1] + (', ' if fields else '') + '"children": [')
+        stack.append(']}')
+        for i, child in enumerate(reversed(children)):
+            stack.append(child)
+            if i < len(children) - 1:
+                stack.append(',\n')
+
 def main():
     page_id = "3492511763"
     
@@ -95,21 +135,21 @@ def main():
     print(f"\n✅ Total pages downloaded: {total_pages}")
     
     # Save detailed output
-    output_data = {
-        'export_metadata': {
-            'export_type': 'confluence_debug_recursive',
-            'page_id': page_id,
-            'timestamp': datetime.now().isoformat(),
-            'total_pages': total_pages
-        },
-        'confluence_content': content
+    export_metadata = {
+        'export_type': 'confluence_debug_recursive',
+        'page_id': page_id,
+        'timestamp': datetime.now().isoformat(),
+        'total_pages': total_pages
     }
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f"confluence_debug_{page_id}_{timestamp}.json"
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False, default=str)
+    # Stream page by page so the encoded document never sits in memory whole
+    with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write('{"export_metadata": ' + dumps_compact(export_metadata) + ',\n"confluence_content": ')
+        write_tree_streaming(f, content)
+        f.write('}\n')
     
     print(f"💾 Saved debug output to: {filename}")
 
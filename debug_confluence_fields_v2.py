@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 """
 Debug script to fetch ALL available fields from Confluence API for specific pages.
+
+Pass --rag to request only the fields the RAG export reads (storage body,
+no rendered views), i.e. what production fetches actually see.
 """
 
 import json
 import os
+import sys
 import requests
 from requests.auth import HTTPBasicAuth
 from dotenv import load_dotenv
+from confluence_expand import DEBUG_EXPAND_FULL, RAG_EXPAND
 
 # Load environment
 load_dotenv()
@@ -15,6 +20,14 @@ CONFLUENCE_BASE_URL = os.getenv("CONFLUENCE_BASE_URL")
 USERNAME = os.getenv("JIRA_USERNAME")
 API_TOKEN = os.getenv("JIRA_API_TOKEN")
 
+# Shared keep-alive session so every expand attempt and page reuses one connection
+session = requests.Session()
+session.auth = HTTPBasicAuth(USERNAME, API_TOKEN)
+session.headers.update({"Accept": "application/json"})
+
+# Production mode: skip the rendered-body attempts and fetch the RAG field set only
+RAG_ONLY = "--rag" in sys.argv[1:]
+
 def fetch_page_all_fields(page_id: str) -> dict:
     """Fetch a page with comprehensive field expansion."""
     
@@ -24,15 +37,15 @@ def fetch_page_all_fields(page_id: str) -> dict:
         "body.storage,body.view,body.export_view,body.styled_view,space,version,metadata.labels,metadata.properties,metadata.frontend,history,ancestors,restrictions,extensions",
         
         # Attempt 2: Everything possible from the _expandable we saw
-        "body.storage,body.view,body.export_view,body.styled_view,body.atlas_doc_format,body.editor,body.editor2,body.dynamic,body.anonymous_export_view,space,version,metadata.labels,metadata.properties,metadata.frontend,metadata.simple,metadata.comments,history,ancestors,restrictions.read,restrictions.update,extensions,children,descendants,operations,status",
+        DEBUG_EXPAND_FULL,
         
-        # Attempt 3: Just the most critical ones
-        "body.storage,body.view,space,version,metadata.labels,metadata.properties,history.lastUpdated,ancestors,restrictions.read"
+        # Attempt 3: Just what the RAG export reads
+        RAG_EXPAND
     ]
+    if RAG_ONLY:
+        expand_attempts = [RAG_EXPAND]
     
     base_url = CONFLUENCE_BASE_URL.rstrip('/')
-    auth = HTTPBasicAuth(USERNAME, API_TOKEN)
-    headers = {"Accept": "application/json"}
     
     for i, expand in enumerate(expand_attempts, 1):
         print(f"\nAttempt {i} - Expand: {expand[:100]}{'...' if len(expand) > 100 else ''}")
@@ -40,7 +53,7 @@ def fetch_page_all_fields(page_id: str) -> dict:
         url = f"{base_url}/rest/api/content/{page_id}?expand={expand}"
         
         try:
-            response = requests.get(url, headers=headers, auth=auth)
+            response = session.get(url, timeout=(5, 30))
             response.raise_for_status()
             data = response.json()
             
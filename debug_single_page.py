@@ -8,6 +8,7 @@ import os
 import requests
 from requests.auth import HTTPBasicAuth
 from dotenv import load_dotenv
+from confluence_expand import RAG_EXPAND
 
 load_dotenv()
 CONFLUENCE_BASE_URL = os.getenv("CONFLUENCE_BASE_URL")
@@ -17,11 +18,12 @@ API_TOKEN = os.getenv("JIRA_API_TOKEN")
 page_id = "4027383817"  # onetrust Privacy Platform
 
 base_url = CONFLUENCE_BASE_URL.rstrip('/')
-auth = HTTPBasicAuth(USERNAME, API_TOKEN)
-headers = {"Accept": "application/json"}
+session = requests.Session()
+session.auth = HTTPBasicAuth(USERNAME, API_TOKEN)
+session.headers.update({"Accept": "application/json"})
 
 # Test the exact expand parameter our confluence client is using
-expand = "body.storage,body.view,body.export_view,space,version,metadata.labels,metadata.properties,history.lastUpdated,ancestors,restrictions.read,restrictions.update,extensions"
+expand = RAG_EXPAND
 
 url = f"{base_url}/rest/api/content/{page_id}?expand={expand}"
 
@@ -29,7 +31,7 @@ print(f"Testing URL: {url}")
 print(f"Expand: {expand}")
 
 try:
-    response = requests.get(url, headers=headers, auth=auth)
+    response = session.get(url, timeout=(5, 30))
     response.raise_for_status()
     data = response.json()
     
@@ -50,7 +50,8 @@ def main():
         base_url=config['confluence_base_url'],
         username=config['username'],
         api_token=config['api_token'],
-        max_concurrent_calls=5
+        max_concurrent_calls=5,
+        cache_dir=os.getenv('CONFLUENCE_CACHE_DIR')  # opt-in page cache for repeat runs
     )
     
     # Extract page ID if URL provided
@@ -77,19 +78,22 @@ def main():
             print(f"❌ Error fetching page: {content['error']}")
             sys.exit(1)
         
+        # One clock reading for both the metadata and the filename
+        now = datetime.now()
+        
         # Prepare output data
         output_data = {
             'export_metadata': {
                 'export_type': 'confluence_page_recursive',
                 'page_id': page_id,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'base_url': config['confluence_base_url']
             },
             'confluence_content': content
         }
         
         # Generate filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
         filename = f"confluence_export_{page_id}_{timestamp}.json"
         
         # Save to file
@@ -97,9 +101,12 @@ def main():
         
         # Print summary
         def count_pages(data):
-            count = 1  # Current page
-            for child in data.get('children', []):
-                count += count_pages(child)
+            count = 0
+            stack = [data]
+            while stack:
+                node = stack.pop()
+                count += 1
+                stack.extend(node.get('children', []))
             return count
         
         total_pages = count_pages(content)
@@ -10,8 +10,15 @@ import json
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
+from confluence_client import ConfluenceClient
 from enhanced_confluence_client import EnhancedConfluenceClient
 
+# Optional faster JSON encoding
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,35 +38,43 @@ def load_config():
     }
 
 def save_to_json(data, filename):
-    """Save data to JSON file."""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+    """Save data to JSON file, encoding with orjson when it is installed."""
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
     print(f"✅ Saved detailed JSON to: {filename}")
 
 def count_pages_and_restrictions(data, level=0):
     """Count pages and analyze restrictions."""
-    indent = "  " * level
-    title = data.get('title', 'Unknown Title')
-    page_id = data.get('id', 'Unknown ID')
-    permissions = data.get('permissions', {})
-    is_restricted = permissions.get('is_restricted', False)
-    children = data.get('children', [])
-    
-    restriction_info = ""
-    if is_restricted:
-        read_users = len(permissions.get('read_restrictions', {}).get('users', []))
-        read_groups = len(permissions.get('read_restrictions', {}).get('groups', []))
-        restriction_info = f" 🔒 (Users: {read_users}, Groups: {read_groups})"
-    
-    print(f"{indent}📄 {title} (ID: {page_id}){restriction_info}")
-    
-    total_count = 1
-    restricted_count = 1 if is_restricted else 0
-    
-    for child in children:
-        child_total, child_restricted = count_pages_and_restrictions(child, level + 1)
-        total_count += child_total
-        restricted_count += child_restricted
+    total_count = 0
+    restricted_count = 0
+    stack = [(data, level)]
+    while stack:
+        node, depth = stack.pop()
+        indent = "  " * depth
+        title = node.get('title', 'Unknown Title')
+        page_id = node.get('id', 'Unknown ID')
+        permissions = node.get('permissions', {})
+        is_restricted = permissions.get('is_restricted', False)
+        children = node.get('children', [])
+        
+        restriction_info = ""
+        if is_restricted:
+            read_restrictions = permissions.get('read_restrictions', {})
+            read_users = len(read_restrictions.get('users', []))
+            read_groups = len(read_restrictions.get('groups', []))
+            restriction_info = f" 🔒 (Users: {read_users}, Groups: {read_groups})"
+        
+        print(f"{indent}📄 {title} (ID: {page_id}){restriction_info}")
+        
+        total_count += 1
+        if is_restricted:
+            restricted_count += 1
+        # Reverse so children print in their original order
+        stack.extend((child, depth + 1) for child in reversed(children))
     
     return total_count, restricted_count
 
@@ -82,16 +97,14 @@ def main():
         base_url=config['confluence_base_url'],
         username=config['username'],
         api_token=config['api_token'],
-        max_concurrent_calls=3  # Reduced for permission queries
+        max_concurrent_calls=3,  # Reduced for permission queries
+        cache_dir=os.getenv('CONFLUENCE_CACHE_DIR')  # opt-in ETag cache for repeat runs
     )
     
     # Extract page ID if URL provided
     if page_input.startswith('http'):
-        # Simple extraction for this example
-        import re
-        match = re.search(r'/pages/(\d+)/', page_input)
-        if match:
-            page_id = match.group(1)
+        page_id = ConfluenceClient.extract_page_id_from_url(page_input)
+        if page_id:
             print(f"📄 Extracted page ID: {page_id}")
         else:
             print(f"❌ Error: Could not extract page ID from URL")
@@ -110,7 +123,8 @@ def main():
             sys.exit(1)
         
         # Generate filenames
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
         json_filename = f"confluence_rag_{page_id}_{timestamp}.json"
         jsonl_filename = f"confluence_rag_{page_id}_{timestamp}.jsonl"
         
@@ -119,7 +133,7 @@ def main():
             'export_metadata': {
                 'export_type': 'confluence_rag_enhanced',
                 'page_id': page_id,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'base_url': config['confluence_base_url'],
                 'includes_permissions': True,
                 'output_format': 'both_json_and_jsonl'
@@ -4,32 +4,216 @@ Enhanced Confluence API client that includes permissions and outputs JSONL for R
 """
 
 import requests
+import urllib3
 import logging
-import time
 import threading
 import json
 import html
 import re
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-from typing import Optional, Dict, List, Set, Any
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Iterator, List, Set, Any, Tuple
 from datetime import datetime
+from confluence_client import PageCache, TokenBucket, parse_json
+from confluence_expand import RAG_EXPAND, RAG_SEARCH_EXPAND
+
+# Optional faster JSON encoding for the JSONL export
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# (connect, read) timeout in seconds for every API call
+REQUEST_TIMEOUT = (5, 30)
+
+# Requested results per CQL search call; the server may return fewer
+SEARCH_PAGE_SIZE = 100
+
+# HTML cleanup patterns, compiled once for every page in an export
+_AC_BLOCK = re.compile(r'<ac:[^>]*>.*?</ac:[^>]*>', re.DOTALL)
+_AC_SELF = re.compile(r'<ac:[^>]*/?>')
+_RI_SELF = re.compile(r'<ri:[^>]*/?>')
+_ANY_TAG = re.compile(r'<[^>]+>')
+_WS = re.compile(r'\s+')
+
+# Extra attempts for a 429 that is still returned after urllib3's own retries
+RATE_LIMIT_RETRIES = 3
+
+# Fraction of the server's rate-limit budget below which calls are spaced out
+RATE_LIMIT_LOW_WATER = 0.1
+
+@lru_cache(maxsize=4096)
+def _clean_html(html_content: str) -> str:
+    """Strip macros and tags from storage-format HTML; memoized on the exact markup."""
+    # Remove Confluence-specific macros
+    content = _AC_BLOCK.sub('', html_content)
+    content = _AC_SELF.sub('', content)
+    content = _RI_SELF.sub('', content)
+    
+    # Remove HTML tags but keep the content
+    content = _ANY_TAG.sub(' ', content)
+    
+    # Decode HTML entities
+    content = html.unescape(content)
+    
+    # Clean up whitespace
+    return _WS.sub(' ', content).strip()
+
+
+def _next_page_url(base_url: str, links: Dict[str, Any]) -> Optional[str]:
+    """Absolute URL of a response's `_links.next` cursor link, or None on the last page."""
+    next_link = links.get("next")
+    if not next_link:
+        return None
+    # v2 links already start with the context path (/wiki); v1 links are relative to _links.base
+    context = links.get("context", urlparse(base_url).path)
+    if urlparse(next_link).scheme or (context and next_link.startswith(context + "/")):
+        return urljoin(base_url, next_link)
+    return (links.get("base") or base_url) + next_link
+
+
+def dumps_line(obj: Dict[str, Any]) -> bytes:
+    """Encode one JSONL record as UTF-8, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
 
 class EnhancedConfluenceClient:
     """Enhanced Confluence client that captures permissions and outputs JSONL for RAG."""
     
     def __init__(self, base_url: str, username: str, api_token: str, 
-                 max_concurrent_calls: int = 5, api_call_delay: float = 0.1):
-        """Initialize enhanced Confluence client."""
+                 max_concurrent_calls: int = 5, api_call_delay: float = 0.1,
+                 use_v2_api: bool = False, cache_dir: Optional[str] = None):
+        """
+        Initialize enhanced Confluence client.
+        
+        Args:
+            base_url: Confluence base URL (e.g., "https://domain.atlassian.net/wiki")
+            username: Confluence username/email
+            api_token: Confluence API token
+            max_concurrent_calls: Maximum concurrent API calls
+            api_call_delay: Pause before each API call, in seconds, while the
+                server reports less than 10% of its rate-limit budget left
+            use_v2_api: List children through the v2 API with cursor pagination
+            cache_dir: Directory for an on-disk cache of fetched pages and their
+                ETags; cached pages are revalidated with If-None-Match
+        """
         self.base_url = base_url.rstrip('/')
         self.username = username
         self.api_token = api_token
         self.api_call_delay = api_call_delay
+        self.use_v2_api = use_v2_api
+        self.cache = PageCache(cache_dir, self.base_url, name="permission_pages") if cache_dir else None
         self.auth = HTTPBasicAuth(username, api_token)
         self.headers = {"Accept": "application/json"}
         self.semaphore = threading.Semaphore(max_concurrent_calls)
+        # No steady rate: calls only wait when the server asks for it
+        self.rate_limiter = TokenBucket(None, burst=max_concurrent_calls)
+        
+        # One pooled keep-alive session so recursive crawls reuse TLS connections
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.session.headers.update(self.headers)
+        # Storage-format bodies are verbose XHTML; ask for every compression
+        # urllib3 can decode here (brotli is added when the package is installed)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self._encoding_logged = False
+        # Transient failures are retried here with exponential backoff (honoring
+        # Retry-After); only terminal errors reach the except blocks below
+        retries = Retry(total=8, backoff_factor=0.5,
+                        status_forcelist=(429, 500, 502, 503, 504),
+                        allowed_methods=frozenset(["GET"]),
+                        respect_retry_after_header=True, raise_on_status=False)
+        # Every request runs under the semaphore, so max_concurrent_calls sockets
+        # cover all in-flight calls to the single Confluence host
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrent_calls,
+                              max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.hooks["response"].append(self._log_encoding)
+        
+        # Workers for the parallel tree crawl, matching the semaphore width
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_calls,
+                                           thread_name_prefix="confluence")
+        # Open the first keep-alive connection in the background, so the TLS
+        # handshake overlaps with the caller's setup instead of the first fetch
+        self.executor.submit(self._warm_up)
         
         logging.debug(f"Initialized Enhanced Confluence client for {base_url}")
     
+    def _warm_up(self) -> None:
+        """Prime the connection pool with a cheap request; failures are only logged."""
+        # Ask the adapter for the urllib3 pool the session's requests will use
+        # (same TLS and proxy settings, environment included), so the socket
+        # opened here is the one they reuse; calling the pool directly keeps the
+        # session's retry policy from stretching a failed warm-up into minutes of backoff
+        url = f"{self.base_url}/rest/api/space?limit=1"
+        request = requests.Request("HEAD", url).prepare()
+        settings = self.session.merge_environment_settings(url, {}, None, None, None)
+        adapter = self.session.get_adapter(url)
+        try:
+            pool = adapter.get_connection_with_tls_context(
+                request, settings["verify"], proxies=settings["proxies"], cert=settings["cert"])
+            pool.urlopen("HEAD", adapter.request_url(request, settings["proxies"]), retries=False, timeout=5)
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+            logging.debug(f"Confluence connection warm-up failed: {e}")
+    
+    def _log_encoding(self, response: requests.Response, *args, **kwargs) -> None:
+        """Log the negotiated Content-Encoding once, to confirm compression is in effect."""
+        if not self._encoding_logged:
+            self._encoding_logged = True
+            logging.debug(f"Confluence response Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}")
+    
+    def close(self) -> None:
+        """Shut down the crawl workers, the pooled HTTP session and the page cache."""
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+    
+    def __enter__(self) -> "EnhancedConfluenceClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _get(self, url: str, params: Optional[Dict[str, Any]] = None,
+             headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        GET a URL, backing off on the server's rate-limit signals.
+        
+        urllib3 already retries 429s honoring Retry-After; a 429 that survives
+        those retries holds back every thread for Retry-After and is tried
+        again. While X-RateLimit-Remaining is under 10% of X-RateLimit-Limit,
+        calls are spaced api_call_delay apart.
+        """
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self.rate_limiter.acquire()
+            response = self.session.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                break
+            try:
+                retry_after = float(response.headers.get("Retry-After", ""))
+            except ValueError:
+                retry_after = self.api_call_delay
+            logging.warning(f"Rate limited by Confluence, retrying in {retry_after}s: {url}")
+            self.rate_limiter.penalize(retry_after)
+        
+        try:
+            remaining = int(response.headers["X-RateLimit-Remaining"])
+            limit = int(response.headers["X-RateLimit-Limit"])
+        except (KeyError, ValueError):
+            return response
+        if remaining < limit * RATE_LIMIT_LOW_WATER:
+            self.rate_limiter.penalize(self.api_call_delay)
+        return response
+    
     def fetch_page_content_with_permissions(self, page_id: str) -> Optional[Dict[str, Any]]:
         """
         Fetch content of a Confluence page including permissions.
@@ -40,63 +224,110 @@ class EnhancedConfluenceClient:
         Returns:
             Dictionary with page data, permissions, and metadata
         """
+        return self._fetch_page(page_id)[0]
+    
+    def _fetch_page(self, page_id: str,
+                    with_children: bool = False) -> Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]:
+        """
+        Fetch a page with permissions, optionally listing its children in the same call.
+        
+        Args:
+            page_id: Confluence page ID
+            with_children: Also expand children.page so no separate listing is needed
+            
+        Returns:
+            (page data or error dict, child summaries) where the summaries are
+            None unless with_children was set and the inline list is complete
+        """
         # Fetch page content with expanded fields including restrictions
-        url = f"{self.base_url}/rest/api/content/{page_id}?expand=body.storage,body.view,body.export_view,space,version,metadata.labels,metadata.properties,history.lastUpdated,ancestors,restrictions.read,restrictions.update,extensions"
+        url = f"{self.base_url}/rest/api/content/{page_id}?expand={RAG_EXPAND}"
+        if with_children:
+            url += ",children.page"
+        
+        # The ETag belongs to the exact representation, so each URL variant has its own entry
+        cache_key = f"{page_id}:children" if with_children else page_id
+        entry = self.cache.get_entry(cache_key) if self.cache is not None else None
         
         logging.debug(f"Fetching Confluence page with permissions: {page_id}")
         self.semaphore.acquire()
         try:
-            time.sleep(self.api_call_delay)
-            response = requests.get(url, headers=self.headers, auth=self.auth)
+            response = self._get(url, headers={"If-None-Match": entry["etag"]} if entry else None)
+            if response.status_code == 304 and entry:
+                logging.debug(f"Confluence page {page_id} unchanged (ETag match); using cached copy")
+                return entry["page"], entry["children"]
             response.raise_for_status()
-            page_data = response.json()
-            
-            # Extract labels
-            labels = []
-            metadata = page_data.get("metadata", {})
-            if "labels" in metadata:
-                labels = [label.get("name", "") for label in metadata.get("labels", {}).get("results", [])]
-                logging.info(f"Enhanced client extracted labels for page {page_id}: {labels}")
-            
-            # Extract permissions
-            permissions = self._extract_permissions(page_data.get('restrictions', {}))
-            
-            # Extract ancestors for context
-            ancestors = []
-            for ancestor in page_data.get('ancestors', []):
-                ancestors.append({
-                    'id': ancestor.get('id'),
-                    'title': ancestor.get('title'),
-                    'type': ancestor.get('type')
-                })
-            
-            # Extract last modified info from history
-            history = page_data.get("history", {})
-            last_updated = history.get("lastUpdated", {})
-            
-            return {
-                "id": page_data.get("id"),
-                "title": page_data.get("title"),
-                "url": page_data.get("_links", {}).get("webui"),
-                "content": page_data.get("body", {}).get("storage", {}).get("value"),
-                "space": page_data.get("space", {}).get("key"),
-                "space_name": page_data.get("space", {}).get("name"),
-                "version": page_data.get("version", {}).get("number"),
-                "labels": labels,
-                "permissions": permissions,
-                "ancestors": ancestors,
-                "created_date": page_data.get("history", {}).get("createdDate"),
-                "last_modified": last_updated.get("when"),
-                "author": last_updated.get("by", {}).get("displayName")
-            }
+            page_data = parse_json(response)
+            page = self._parse_page(page_data)
+            child_pages = self._inline_child_pages(page_data) if with_children else None
+            etag = response.headers.get("ETag")
+            if self.cache is not None and etag:
+                self.cache.put_entry(cache_key, {"etag": etag, "page": page, "children": child_pages})
+            return page, child_pages
         except requests.exceptions.RequestException as e:
             logging.error(f"Error fetching Confluence page {page_id}: {e}")
-            return {"error": str(e), "id": page_id}
+            return {"error": str(e), "id": page_id}, None
         finally:
             self.semaphore.release()
     
+    def _parse_page(self, page_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the page dict (content, labels, permissions, ancestors) from an expanded content entity."""
+        # Extract labels
+        labels = []
+        metadata = page_data.get("metadata", {})
+        if "labels" in metadata:
+            labels = [label.get("name", "") for label in metadata.get("labels", {}).get("results", [])]
+            logging.info(f"Enhanced client extracted labels for page {page_data.get('id')}: {labels}")
+        
+        # Extract permissions
+        permissions = self._extract_permissions(page_data.get('restrictions', {}))
+        
+        # Extract ancestors for context
+        ancestors = [
+            {'id': ancestor.get('id'), 'title': ancestor.get('title'), 'type': ancestor.get('type')}
+            for ancestor in page_data.get('ancestors', [])
+        ]
+        
+        # Extract last modified info from history
+        history = page_data.get("history", {})
+        last_updated = history.get("lastUpdated", {})
+        space = page_data.get("space", {})
+        
+        return {
+            "id": page_data.get("id"),
+            "title": page_data.get("title"),
+            "url": page_data.get("_links", {}).get("webui"),
+            "content": page_data.get("body", {}).get("storage", {}).get("value"),
+            "space": space.get("key"),
+            "space_name": space.get("name"),
+            "version": page_data.get("version", {}).get("number"),
+            "labels": labels,
+            "permissions": permissions,
+            "ancestors": ancestors,
+            "created_date": history.get("createdDate"),
+            "last_modified": last_updated.get("when"),
+            "author": last_updated.get("by", {}).get("displayName")
+        }
+    
+    @staticmethod
+    def _inline_child_pages(page_data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Return child summaries from an expanded children.page, or None if it was truncated."""
+        children = page_data.get("children", {}).get("page")
+        if children is None:
+            return None
+        results = children.get("results", [])
+        # The inline list is a single page of results; more pages need the listing endpoint
+        if "next" in children.get("_links", {}) or len(results) >= children.get("limit", len(results) + 1):
+            return None
+        return [{
+            "id": child.get("id"),
+            "title": child.get("title"),
+            "url": child.get("_links", {}).get("webui")
+        } for child in results]
+    
     def _extract_permissions(self, restrictions: Dict) -> Dict[str, Any]:
         """Extract permission information from restrictions."""
+        # Deliberately not memoized: building this is about a microsecond, while
+        # fingerprinting the restrictions and copying a cached result costs more
         permissions = {
             "read_restrictions": {
                 "users": [],
@@ -141,30 +372,17 @@ class EnhancedConfluenceClient:
         """Clean HTML content for RAG ingestion."""
         if not html_content:
             return ""
-        
-        # Remove Confluence-specific macros
-        content = re.sub(r'<ac:[^>]*>.*?</ac:[^>]*>', '', html_content, flags=re.DOTALL)
-        content = re.sub(r'<ac:[^>]*/?>', '', content)
-        content = re.sub(r'<ri:[^>]*/?>', '', content)
-        
-        # Remove HTML tags but keep the content
-        content = re.sub(r'<[^>]+>', ' ', content)
-        
-        # Decode HTML entities
-        content = html.unescape(content)
-        
-        # Clean up whitespace
-        content = re.sub(r'\s+', ' ', content).strip()
-        
-        return content
+        return _clean_html(html_content)
     
     def convert_page_to_rag_format(self, page_data: Dict[str, Any]) -> Dict[str, Any]:
         """Convert page data to format suitable for Vertex AI RAG ingestion."""
+        page_id = page_data.get('id')
         clean_content = self.clean_html_content(page_data.get('content', ''))
+        permissions = page_data.get('permissions', {})
         
         # Create document structure for RAG
         rag_document = {
-            "id": f"confluence_{page_data.get('id')}",
+            "id": f"confluence_{page_id}",
             "title": page_data.get('title', ''),
             "content": clean_content,
             "url": f"{self.base_url}{page_data.get('url', '')}",
@@ -172,49 +390,185 @@ class EnhancedConfluenceClient:
                 "source": "confluence",
                 "space": page_data.get('space'),
                 "space_name": page_data.get('space_name'),
-                "page_id": page_data.get('id'),
+                "page_id": page_id,
                 "version": page_data.get('version'),
                 "last_modified": page_data.get('last_modified'),
                 "author": page_data.get('author'),
                 "ancestors": page_data.get('ancestors', []),
-                "permissions": page_data.get('permissions', {}),
-                "is_restricted": page_data.get('permissions', {}).get('is_restricted', False)
+                "permissions": permissions,
+                "is_restricted": permissions.get('is_restricted', False)
             }
         }
         
         return rag_document
     
     def fetch_content_recursive_with_permissions(self, page_id: str, visited_pages: Optional[Set] = None) -> Optional[Dict[str, Any]]:
-        """Fetch page content recursively with permissions for all pages."""
+        """
+        Fetch page content recursively with permissions for all pages.
+        
+        The whole tree is normally read through a paginated CQL descendant
+        search (about one call per 100 pages) and rebuilt from each page's
+        ancestors. If that search fails, the tree is crawled page by page,
+        with sibling pages fetched in parallel on the client's worker pool.
+        """
         if visited_pages is None:
             visited_pages = set()
         
-        if page_id in visited_pages:
-            logging.debug(f"Skipping already visited page: {page_id}")
+        if not self._claim_page(visited_pages, page_id):
             return None
         
-        visited_pages.add(page_id)
+        # The root is not its own descendant, so fetch it alongside the search
+        root_future = self.executor.submit(self.fetch_page_content_with_permissions, page_id)
+        descendants = self.fetch_descendants_bulk(page_id)
+        root = root_future.result()
+        if descendants is None:
+            logging.info(f"CQL search unavailable for page {page_id}; crawling children page by page")
+            return self._crawl_with_permissions(page_id, visited_pages)
+        if not root or "error" in root:
+            return {"id": page_id, "error": (root or {}).get("error", "Failed to fetch content")}
+        
+        children_of = {}
+        for entry in descendants:
+            children_of.setdefault(entry["parent_id"], []).append(entry)
+        
+        # Search results come back in relevance order; restore page-tree order
+        for siblings in children_of.values():
+            if all(isinstance(entry["position"], int) for entry in siblings):
+                siblings.sort(key=lambda entry: entry["position"])
+        
+        root["children"] = []
+        queue = [root]
+        for node in queue:
+            for entry in children_of.get(node["id"], []):
+                child = entry["page"]
+                if not child.get("id") or not self._claim_page(visited_pages, child["id"]):
+                    continue
+                child["children"] = []
+                node["children"].append(child)
+                queue.append(child)
+        return root
+    
+    def fetch_descendants_bulk(self, root_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch every descendant page of a root, with permissions, through CQL search.
+        
+        Result pages are followed through the `_links.next` cursor the search
+        returns, one after another; offset paging is not reliable on Cloud.
+        
+        Args:
+            root_id: Root page ID
+            
+        Returns:
+            List of {"page", "parent_id", "position"} entries, where page is in
+            the fetch_page_content_with_permissions format, or None if the
+            search failed (e.g. CQL is disabled on the instance) or stopped
+            making progress
+        """
+        logging.debug(f"Searching Confluence descendants of: {root_id}")
+        
+        url = f"{self.base_url}/rest/api/content/search"
+        params = {"cql": f"ancestor={root_id} and type=page", "expand": RAG_SEARCH_EXPAND,
+                  "limit": SEARCH_PAGE_SIZE}
+        descendants = []
+        seen_ids = set()
+        while url:
+            data = self._search_descendants(root_id, url, params)
+            if data is None:
+                return None
+            
+            new_results = [page_data for page_data in data.get("results", [])
+                           if page_data.get("id") not in seen_ids]
+            next_url = _next_page_url(self.base_url, data.get("_links") or {})
+            if next_url and not new_results:
+                # A cursor that keeps serving known pages would never end; crawl instead
+                logging.warning(f"Descendant search of page {root_id} stopped returning new pages")
+                return None
+            
+            for page_data in new_results:
+                seen_ids.add(page_data.get("id"))
+                ancestors = page_data.get("ancestors") or []
+                descendants.append({
+                    "page": self._parse_page(page_data),
+                    "parent_id": ancestors[-1].get("id") if ancestors else None,
+                    "position": (page_data.get("extensions") or {}).get("position")
+                })
+            # The next link carries the query, expand and cursor itself
+            url, params = next_url, None
+        
+        logging.info(f"Found {len(descendants)} descendants for page {root_id}")
+        return descendants
+    
+    def _search_descendants(self, root_id: str, url: str,
+                            params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Fetch one page of the CQL descendant search, or None on error."""
+        self.semaphore.acquire()
+        try:
+            response = self._get(url, params=params)
+            response.raise_for_status()
+            return parse_json(response)
+        except requests.exceptions.RequestException as e:
+            logging.warning(f"Error searching descendants of page {root_id}: {e}")
+            return None
+        finally:
+            self.semaphore.release()
+    
+    def _crawl_with_permissions(self, page_id: str, visited_pages: Set) -> Dict[str, Any]:
+        """
+        Crawl the tree under an already-claimed page_id breadth-first.
+        
+        Sibling pages are fetched in parallel on the client's worker pool; the
+        calling thread schedules work as results arrive and stitches the tree.
+        """
+        nodes = {}
+        child_ids = {}
+        pending = {self.executor.submit(self._fetch_page_and_children, page_id): page_id}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                current_id = pending.pop(future)
+                page_data, child_pages = future.result()
+                nodes[current_id] = page_data
+                if "error" in page_data:
+                    continue
+                
+                child_ids[current_id] = []
+                if child_pages:
+                    logging.info(f"  Found {len(child_pages)} children for page {current_id}")
+                for child in child_pages:
+                    child_id = child.get("id")
+                    if child_id and self._claim_page(visited_pages, child_id):
+                        child_ids[current_id].append(child_id)
+                        pending[self.executor.submit(self._fetch_page_and_children, child_id)] = child_id
         
-        # Fetch page content with permissions
-        page_data = self.fetch_page_content_with_permissions(page_id)
+        # Children keep their listing order regardless of completion order
+        for parent_id, kids in child_ids.items():
+            nodes[parent_id]["children"] = [nodes[kid] for kid in kids]
+        return nodes[page_id]
+    
+    @staticmethod
+    def _claim_page(visited_pages: Set, page_id: str) -> bool:
+        """
+        Mark a page as visited, returning False if it already was.
+        
+        Only the thread driving the recursive fetch calls this; pool
+        workers never see visited_pages, so no lock is needed.
+        """
+        if page_id in visited_pages:
+            logging.debug(f"Skipping already visited page: {page_id}")
+            return False
+        visited_pages.add(page_id)
+        return True
+    
+    def _fetch_page_and_children(self, page_id: str):
+        """Fetch one page with permissions and, if that succeeded, its child list (inline when possible)."""
+        page_data, child_pages = self._fetch_page(page_id, with_children=True)
         if not page_data or "error" in page_data:
-            return {"id": page_id, "error": page_data.get("error", "Failed to fetch content")}
-        
-        # Fetch child pages
-        child_pages = self.fetch_child_pages(page_id)
-        children_data = []
-        
-        if child_pages:
-            logging.info(f"  Found {len(child_pages)} children for page {page_id}")
-            for child in child_pages:
-                child_id = child.get("id")
-                if child_id:
-                    child_content = self.fetch_content_recursive_with_permissions(child_id, visited_pages)
-                    if child_content:
-                        children_data.append(child_content)
-        
-        page_data["children"] = children_data
-        return page_data
+            return {"id": page_id, "error": (page_data or {}).get("error", "Failed to fetch content")}, []
+        if child_pages is not None:
+            return page_data, child_pages
+        # Inline list was truncated (or missing); page through the listing endpoint
+        list_children = self.fetch_child_pages_v2 if self.use_v2_api else self.fetch_child_pages
+        return page_data, list_children(page_id)
     
     def fetch_child_pages(self, page_id: str) -> List[Dict[str, Any]]:
         """Fetch child pages of a Confluence page with pagination support."""
@@ -229,10 +583,9 @@ class EnhancedConfluenceClient:
             
             self.semaphore.acquire()
             try:
-                time.sleep(self.api_call_delay)
-                response = requests.get(url, headers=self.headers, auth=self.auth)
+                response = self._get(url)
                 response.raise_for_status()
-                children_data = response.json()
+                children_data = parse_json(response)
                 
                 results = children_data.get("results", [])
                 if not results:
@@ -264,25 +617,66 @@ class EnhancedConfluenceClient:
         
         return child_pages_summary
     
-    def export_to_jsonl(self, content_tree: Dict[str, Any], output_file: str):
-        """Export content tree to JSONL format for Vertex AI RAG ingestion."""
-        documents = []
-        self._flatten_content_tree(content_tree, documents)
+    def fetch_child_pages_v2(self, page_id: str) -> List[Dict[str, Any]]:
+        """
+        Fetch child pages through the v2 API, following its pagination cursor.
+        
+        Cursor pages are served without re-scanning earlier results, and the
+        v2 page size limit is larger, so wide parents take fewer calls.
+        
+        Args:
+            page_id: Confluence page ID
+            
+        Returns:
+            Child page summaries in the same shape as fetch_child_pages
+        """
+        child_pages_summary = []
+        url = f"{self.base_url}/api/v2/pages/{page_id}/children?limit=250"
+        
+        logging.debug(f"Fetching Confluence child pages (v2) for: {page_id}")
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for doc in documents:
-                rag_doc = self.convert_page_to_rag_format(doc)
-                f.write(json.dumps(rag_doc, ensure_ascii=False) + '\n')
+        while url:
+            self.semaphore.acquire()
+            try:
+                response = self._get(url)
+                response.raise_for_status()
+                children_data = parse_json(response)
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Error fetching child pages for page {page_id}: {e}")
+                break
+            finally:
+                self.semaphore.release()
+            
+            for child in children_data.get("results", []):
+                child_pages_summary.append({
+                    "id": child.get("id"),
+                    "title": child.get("title"),
+                    "url": child.get("_links", {}).get("webui")
+                })
+            
+            # "next" is site-relative (it starts with /wiki) and absent on the last page
+            next_link = children_data.get("_links", {}).get("next")
+            url = urljoin(self.base_url, next_link) if next_link else None
+        
+        return child_pages_summary
+    
+    def export_to_jsonl(self, content_tree: Dict[str, Any], output_file: str):
+        """Stream the content tree to a JSONL file for Vertex AI RAG ingestion, one page at a time."""
+        doc_count = 0
+        with open(output_file, 'wb', buffering=1 << 20) as f:
+            for doc in self._iter_documents(content_tree):
+                f.write(dumps_line(self.convert_page_to_rag_format(doc)))
+                doc_count += 1
         
-        logging.info(f"✅ Exported {len(documents)} documents to JSONL: {output_file}")
-        return len(documents)
+        logging.info(f"✅ Exported {doc_count} documents to JSONL: {output_file}")
+        return doc_count
     
-    def _flatten_content_tree(self, node: Dict[str, Any], documents: List[Dict[str, Any]]):
-        """Recursively flatten content tree into list of documents."""
-        # Add current page if it has content
-        if not node.get("error") and node.get("content"):
-            documents.append(node)
-        
-        # Process children
-        for child in node.get("children", []):
-            self._flatten_content_tree(child, documents)
\ No newline at end of file
+    def _iter_documents(self, node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield pages with content from the tree in depth-first order."""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if not current.get("error") and current.get("content"):
+                yield current
+            # Reverse so children come out in their original order
+            stack.extend(reversed(current.get("children", [])))
@@ -1,6 +1,22 @@
 import json
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 
+# Optional streaming JSON parser; without it the export is loaded whole
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Optional faster JSON decoding for the whole-file fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so it needs no entry here
+JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError) if ijson is not None else (json.JSONDecodeError,)
+
 # --- Configuration ---
 JIRA_EXPORT_FILE = "jira_export_jql_4102e7e0e1_20250602_002729_raw.json" # Input file
 OUTPUT_MARKDOWN_FILE = "executive_summary.md" # Output file
@@ -23,31 +39,32 @@ TEAM_MEMBERS = {
     ]
 }
 
-# --- Helper Functions ---
+# Markdown skeleton for one report section, and the text for a team with nothing to report
+SECTION_TEMPLATE = "### {heading}\\n{lines}\\n\\n"
+NO_UPDATES_TEXT = "*No significant updates for the past week.*\\n\\n"
 
-def get_field_value(issue_fields, field_path, default=None):
-    """Safely get a nested field value from issue_fields dictionary."""
-    value = issue_fields
-    try:
-        for key in field_path.split('.'):
-            if value is None: # Check if intermediate key leads to None
-                return default
-            value = value.get(key)
-        return value if value is not None else default
-    except AttributeError:
-        return default
+# --- Helper Functions ---
 
+@lru_cache(maxsize=4096) # Bulk edits leave many issues with the same 'updated' value
 def format_date(date_str):
     """Format ISO date string to a more readable format, e.g., YYYY-MM-DD."""
     if not date_str:
         return "N/A"
+    # Jira timestamps already start with YYYY-MM-DD, so slice instead of parsing
+    if (len(date_str) >= 10 and date_str[4] == '-' and date_str[7] == '-'
+            and date_str[:4].isdigit() and date_str[5:7].isdigit() and date_str[8:10].isdigit()):
+        return date_str[:10]
     try:
         return datetime.fromisoformat(date_str.replace("Z", "+00:00")).strftime('%Y-%m-%d')
     except ValueError:
         return date_str # Return original if parsing fails
 
-def is_recent(date_str, days=7):
-    """Check if the date_str is within the last 'days' days."""
+def is_recent(date_str, days=7, cutoff=None):
+    """Check if the date_str is within the last 'days' days.
+
+    Pass a precomputed cutoff (now minus the window) when checking many dates,
+    so the clock is read once per run instead of once per call.
+    """
     if not date_str:
         return False
     try:
@@ -58,105 +75,136 @@ def is_recent(date_str, days=7):
              # Make it offset-aware, assuming UTC if not specified (Jira usually uses UTC)
             date_obj = date_obj.replace(tzinfo=timezone.utc)
 
-        now_aware = datetime.now(timezone.utc)
-        return (now_aware - date_obj) <= timedelta(days=days)
+        if cutoff is None:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        return date_obj >= cutoff
     except Exception:
         return False # If parsing fails or any other error
 
+def iter_issues(path):
+    """Yield the export's processed issues one at a time, streaming when ijson is installed."""
+    if ijson is not None:
+        # ijson picks its fastest available backend (yajl2_c when compiled)
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'processed_issues_data.item')
+    elif orjson is not None:
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+        yield from data.get("processed_issues_data", [])
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        yield from data.get("processed_issues_data", [])
+
 # --- Main Processing ---
 
 def generate_summary():
+    # Reverse mapping from member to team for easier lookup
+    member_to_team = {}
+    for team, members in TEAM_MEMBERS.items():
+        for member in members:
+            member_to_team[member] = team
+
+    # One dict per report section, keyed by team, so each append is a single lookup
+    completed_by_team = {team: [] for team in TEAM_MEMBERS}
+    in_progress_by_team = {team: [] for team in TEAM_MEMBERS}
+    blockers_by_team = {team: [] for team in TEAM_MEMBERS}
+
+    # Lowercased status category -> section it is reported in; other categories are skipped
+    category_to_section = {
+        "done": completed_by_team,
+        "in progress": in_progress_by_team,
+        "indeterminate": in_progress_by_team, # 'indeterminate' often means 'in progress'
+    }
+    # Jira uses a handful of category names, so lowercase each distinct one once
+    section_by_raw_category = {}
+
+    # Issues are parsed as they are consumed, so the export never sits in memory whole
+    issue_count = 0
     try:
-        with open(JIRA_EXPORT_FILE, 'r') as f:
-            data = json.load(f)
+        for issue in iter_issues(JIRA_EXPORT_FILE):
+            issue_count += 1
+            # Nested fields are read with direct .get() chains; Jira sends null for unset objects
+            fields = issue.get("fields") or {}
+            assignee_name = (fields.get("assignee") or {}).get("displayName")
+
+            team_name = member_to_team.get(assignee_name)
+            if team_name is None:
+                continue # Skip if no assignee or assignee not in our teams
+
+            # Gate on status category before reading anything else
+            # (move this below any blocker detection that is added later)
+            status_obj = fields.get("status") or {}
+            raw_category = (status_obj.get("statusCategory") or {}).get("name") or "Unknown"
+            try:
+                section = section_by_raw_category[raw_category]
+            except KeyError:
+                section = section_by_raw_category[raw_category] = category_to_section.get(raw_category.lower())
+            if section is None:
+                continue
+
+            issue_key = issue.get("key", "N/A")
+            summary = fields.get("summary")
+            if summary is None:
+                summary = "No summary"
+            status = status_obj.get("name")
+            if status is None:
+                status = "Unknown Status"
+            updated_date = fields.get("updated")
+            # status_category_changed_date = fields.get("statuscategorychangedate") # Already filtered by JQL
+
+            # For sub-tasks, try to get parent summary for context
+            parent_summary = ""
+            issuetype = fields.get("issuetype")
+            if issuetype and issuetype.get("subtask"):
+                parent = fields.get("parent")
+                parent_s = parent and (parent.get("fields") or {}).get("summary")
+                if parent_s:
+                    parent_summary = f" (Parent: {parent_s})"
+
+            issue_line = f"- **{issue_key}**: {summary}{parent_summary} (Status: {status}, Assignee: {assignee_name}, Updated: {format_date(updated_date)})"
+
+            # --- Categorize for summary ---
+            # For now, we rely on the JQL's "statusCategoryChangedDate > -1w" for recency.
+            # We can add more specific date checks if needed; compute
+            # datetime.now(timezone.utc) - timedelta(days=7) once before the loop
+            # and pass it to is_recent as cutoff.
+
+            section[team_name].append(issue_line)
+            # Add blocker detection logic here if specific statuses/keywords are used for blockers
+            # For example:
+            # if "blocked" in status.lower() or "blocker" in summary.lower():
+            #     blockers_by_team[team_name].append(issue_line)
     except FileNotFoundError:
         print(f"Error: Input file '{JIRA_EXPORT_FILE}' not found.")
         return
-    except json.JSONDecodeError:
+    except JSON_ERRORS:
         print(f"Error: Could not decode JSON from '{JIRA_EXPORT_FILE}'.")
         return
 
-    processed_issues = data.get("processed_issues_data", [])
-    if not processed_issues:
+    if not issue_count:
         print("No issues found in the export file.")
         return
 
-    # Reverse mapping from member to team for easier lookup
-    member_to_team = {}
-    for team, members in TEAM_MEMBERS.items():
-        for member in members:
-            member_to_team[member] = team
-
-    team_updates = {team: {"completed": [], "in_progress": [], "blockers": []} for team in TEAM_MEMBERS}
-
-    for issue in processed_issues:
-        fields = issue.get("fields", {})
-        assignee_name = get_field_value(fields, "assignee.displayName")
-        
-        if not assignee_name or assignee_name not in member_to_team:
-            continue # Skip if no assignee or assignee not in our teams
-
-        team_name = member_to_team[assignee_name]
-        
-        issue_key = issue.get("key", "N/A")
-        summary = get_field_value(fields, "summary", "No summary")
-        status = get_field_value(fields, "status.name", "Unknown Status")
-        status_category = get_field_value(fields, "status.statusCategory.name", "Unknown").lower()
-        updated_date = get_field_value(fields, "updated")
-        # status_category_changed_date = get_field_value(fields, "statuscategorychangedate") # Already filtered by JQL
-
-        # For sub-tasks, try to get parent summary for context
-        parent_summary = ""
-        if get_field_value(fields, "issuetype.subtask", False):
-            parent_s = get_field_value(fields, "parent.fields.summary")
-            if parent_s:
-                parent_summary = f" (Parent: {parent_s})"
-
-        issue_line = f"- **{issue_key}**: {summary}{parent_summary} (Status: {status}, Assignee: {assignee_name}, Updated: {format_date(updated_date)})"
-        
-        # --- Categorize for summary ---
-        # For now, we rely on the JQL's "statusCategoryChangedDate > -1w" for recency.
-        # We can add more specific date checks if needed.
-
-        if status_category == "done":
-            team_updates[team_name]["completed"].append(issue_line)
-        elif status_category == "in progress" or status_category == "indeterminate": # 'indeterminate' often means 'in progress'
-            team_updates[team_name]["in_progress"].append(issue_line)
-        # Add blocker detection logic here if specific statuses/keywords are used for blockers
-        # For example:
-        # if "blocked" in status.lower() or "blocker" in summary.lower():
-        #     team_updates[team_name]["blockers"].append(issue_line)
-
-
     # --- Generate Markdown Output ---
-    with open(OUTPUT_MARKDOWN_FILE, 'w') as md_file:
-        md_file.write(f"# Weekly Engineering Update - {datetime.now().strftime('%Y-%m-%d')}\\n\\n")
-        
-        for team_name, updates in team_updates.items():
-            md_file.write(f"## {team_name}\\n\\n")
-            
-            if updates["completed"]:
-                md_file.write("### ✅ Key Accomplishments / Recently Completed\\n")
-                for item in updates["completed"]:
-                    md_file.write(f"{item}\\n")
-                md_file.write("\\n")
-            
-            if updates["in_progress"]:
-                md_file.write("### 🚧 Ongoing Key Initiatives / In Progress\\n")
-                for item in updates["in_progress"]:
-                    md_file.write(f"{item}\\n")
-                md_file.write("\\n")
-
-            if updates["blockers"]: # Only show if there are blockers
-                md_file.write("### 🛑 Blockers / Needs Attention\\n")
-                for item in updates["blockers"]:
-                    md_file.write(f"{item}\\n")
-                md_file.write("\\n")
-            
-            if not updates["completed"] and not updates["in_progress"] and not updates["blockers"]:
-                md_file.write("*No significant updates for the past week.*\\n\\n")
-            
-            md_file.write("---\\n\\n") # Separator between teams
+    # Collect the document in memory and write it once
+    parts = [f"# Weekly Engineering Update - {datetime.now().strftime('%Y-%m-%d')}\\n\\n"]
+
+    for team_name in TEAM_MEMBERS:
+        sections = []
+        for heading, items in (
+            ("✅ Key Accomplishments / Recently Completed", completed_by_team[team_name]),
+            ("🚧 Ongoing Key Initiatives / In Progress", in_progress_by_team[team_name]),
+            ("🛑 Blockers / Needs Attention", blockers_by_team[team_name]),
+        ):
+            if items: # Empty sections are left out
+                sections.append(SECTION_TEMPLATE.format(heading=heading, lines="\\n".join(items)))
+
+        # One string per team, ending with the separator between teams
+        parts.append(f"## {team_name}\\n\\n{''.join(sections) or NO_UPDATES_TEXT}---\\n\\n")
+
+    with open(OUTPUT_MARKDOWN_FILE, 'w', encoding='utf-8') as md_file:
+        md_file.write(''.join(parts))
 
     print(f"Executive summary generated: {OUTPUT_MARKDOWN_FILE}")
 
@@ -7,8 +7,12 @@ Outputs: JSON file with all fetched data for easy LLM consumption
 
 import requests
 import json
+import re
 from datetime import datetime
+from urllib.parse import urljoin, urlparse
 from requests.auth import HTTPBasicAuth
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import io # Added for Google Drive downloads
 import logging # Added logging module
@@ -16,7 +20,14 @@ import argparse # Added argparse module
 import time # For basic delays
 import threading # For Semaphores
 import queue # For thread-safe queue
-from concurrent.futures import ThreadPoolExecutor, as_completed # For concurrent processing
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED # For concurrent processing
+from confluence_expand import SLIM_EXPAND, SLIM_SEARCH_EXPAND
+
+# Optional faster JSON decoding of API responses and encoding of the export
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure basic logging as early as possible
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -73,7 +84,19 @@ if not JIRA_BASE_URL or not USERNAME or not API_TOKEN or not CONFLUENCE_BASE_URL
     logging.error("CRITICAL: JIRA_BASE_URL, JIRA_USERNAME, JIRA_API_TOKEN, and/or CONFLUENCE_BASE_URL are not set after attempting to load .env. Please ensure they are in your .env file or system environment.")
     exit(1)
 
-MAX_RESULTS_PER_JIRA_PAGE = 100 # Configurable page size for Jira API calls
+MAX_RESULTS_PER_JIRA_PAGE = 500 # Requested page size for JQL searches; Jira may return fewer per page
+ISSUE_KEY_BATCH_SIZE = 100 # Keys per bulk fetch call for subtasks/linked issues, the endpoint's limit
+CONFLUENCE_SEARCH_PAGE_SIZE = 250 # Requested CQL search page size; Confluence may cap it lower
+CONFLUENCE_ID_BATCH_SIZE = 100 # Page ids per `id in (...)` / `ancestor in (...)` CQL search
+GDRIVE_DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024 # Bytes per Drive download request; the client default is 100 KB
+GDRIVE_BATCH_SIZE = 100 # Sub-requests per Drive batch call, the API's documented limit
+# Fields requested from JQL searches: the ones the exporter and the downstream
+# summary/workflow scripts read. Set JIRA_SEARCH_FIELDS=*all to get every field.
+JIRA_SEARCH_FIELDS = os.getenv(
+    "JIRA_SEARCH_FIELDS",
+    "summary,status,assignee,reporter,priority,issuetype,parent,labels,components,issuelinks,"
+    "subtasks,created,updated,statuscategorychangedate,resolution,resolutiondate,description"
+)
 API_CALL_DELAY_SECONDS = 0.1 # Basic delay after each significant API call
 
 # Semaphores to limit concurrent API calls to each service
@@ -86,6 +109,43 @@ JIRA_SEMAPHORE = threading.Semaphore(MAX_CONCURRENT_JIRA_CALLS)
 CONFLUENCE_SEMAPHORE = threading.Semaphore(MAX_CONCURRENT_CONFLUENCE_CALLS)
 GDRIVE_SEMAPHORE = threading.Semaphore(MAX_CONCURRENT_GDRIVE_CALLS)
 
+# One keep-alive session shared by every Jira and Confluence call, so worker threads
+# reuse TLS connections instead of handshaking per request. Calls already run under
+# the semaphores above, so the pool holds one socket per allowed in-flight call and
+# pool_block makes any excess wait for a free socket rather than open a new one.
+SESSION = requests.Session()
+SESSION.auth = HTTPBasicAuth(USERNAME, API_TOKEN)
+SESSION.headers.update({"Accept": "application/json"})
+# Transient failures are retried here with exponential backoff (honoring
+# Retry-After); only terminal errors reach the fetchers' except blocks.
+# The only POST sent is the read-only issue bulk fetch, so it is retried too.
+_http_retries = Retry(total=5, backoff_factor=0.5,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(["GET", "POST"]),
+                      respect_retry_after_header=True, raise_on_status=False)
+_http_adapter = HTTPAdapter(pool_connections=2,
+                            pool_maxsize=MAX_CONCURRENT_JIRA_CALLS + MAX_CONCURRENT_CONFLUENCE_CALLS,
+                            pool_block=True, max_retries=_http_retries)
+SESSION.mount("https://", _http_adapter)
+SESSION.mount("http://", _http_adapter)
+
+def parse_json(response):
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
+            # Match response.json() so callers' RequestException handlers still apply
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+    return response.json()
+
+# Shared workers for Jira searches that overlap other work (an epic's children).
+# Kept separate from main()'s issue workers, which submit to it, so the two never
+# wait on each other; the Jira semaphore still bounds the calls in flight.
+FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JIRA_CALLS, thread_name_prefix="jira-fetch")
+# Workers for the parallel Confluence tree crawl, matching the Confluence semaphore width
+CONFLUENCE_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CONFLUENCE_CALLS, thread_name_prefix="confluence")
+
 # Global variable for the Drive service to avoid re-initializing it repeatedly.
 DRIVE_SERVICE = None
 
@@ -102,14 +162,38 @@ def process_issue_fully(issue_json, indent_str="", skip_remote=False):
     
     # Print main issue summary using logging
     # print_issue_summary(issue_json) # Keep this if you want separate detailed print output
-    logging.info(f"{indent_str}Processing details for issue: {issue_key} - {issue_json.get('fields', {}).get('summary', 'N/A')}")
+    logging.info("%sProcessing details for issue: %s - %s", indent_str, issue_key, issue_json.get('fields', {}).get('summary', 'N/A'))
+
+    # If this issue is an Epic, start fetching its children (summaries) now, so the search
+    # overlaps the remote-link fetches below; it is collected at the end.
+    # This should only happen once per epic due to globally_processed_issue_keys check.
+    epic_children_future = None
+    if issue_json.get('fields', {}).get('issuetype', {}).get('name') == 'Epic' and issue_key not in globally_processed_issue_keys:
+        logging.info("%s  Epic %s: Fetching children summaries.", indent_str, issue_key)
+        epic_children_future = FETCH_EXECUTOR.submit(fetch_epic_children, issue_key)
 
     # Fetch and process remote links
     if issue_key not in globally_processed_issue_keys or not skip_remote: # Only process if new or if not skipping remote
         remote_links = fetch_remote_links(issue_key)
         if remote_links:
             issue_json["remote_links_data"] = remote_links
-            logging.info(f"{indent_str}  Found {len(remote_links)} remote link(s) for {issue_key}.")
+            logging.info("%s  Found %d remote link(s) for %s.", indent_str, len(remote_links), issue_key)
+
+            # Every Confluence page linked from this issue is fetched in one bulk search
+            linked_page_ids = {} # Link index -> Confluence page id
+            confluence_trees = {}
+            if not skip_remote:
+                for idx, r_link in enumerate(remote_links):
+                    link_obj = r_link.get('object', {})
+                    link_url = link_obj.get('url', 'N/A') if isinstance(link_obj, dict) else 'N/A'
+                    if is_confluence_link(link_url):
+                        page_id = confluence_page_id_from_url(link_url)
+                        if page_id:
+                            linked_page_ids[idx] = page_id
+                if linked_page_ids:
+                    logging.info("%s    Fetching Confluence content for page ID(s): %s...", indent_str, ", ".join(dict.fromkeys(linked_page_ids.values())))
+                    confluence_trees = fetch_confluence_trees_bulk(linked_page_ids.values())
+
             for idx, r_link in enumerate(remote_links):
                 link_obj = r_link.get('object', {})
                 if not isinstance(link_obj, dict):
@@ -117,36 +201,24 @@ def process_issue_fully(issue_json, indent_str="", skip_remote=False):
                     continue
                 link_title = link_obj.get('title', 'N/A')
                 link_url = link_obj.get('url', 'N/A')
-                logging.info(f"{indent_str}    - Link {idx+1}: {link_title} ({link_url})")
+                logging.info("%s    - Link %d: %s (%s)", indent_str, idx+1, link_title, link_url)
 
                 if skip_remote:
-                    logging.debug(f"{indent_str}      Skipping remote content fetch for {link_url} due to --skip-remote-content flag.")
+                    logging.debug("%s      Skipping remote content fetch for %s due to --skip-remote-content flag.", indent_str, link_url)
                     if isinstance(issue_json["remote_links_data"][idx], dict):
                          issue_json["remote_links_data"][idx]["content_skipped"] = True
                     continue
 
                 # Confluence
-                if "simplifi.atlassian.net/wiki/spaces/" in link_url or "/wiki/pages/" in link_url:
-                    page_id = None
-                    if "?pageId=" in link_url:
-                        try: page_id = link_url.split('?pageId=')[1].split('&')[0]
-                        except IndexError: logging.warning(f"{indent_str}      Could not parse pageId from URL: {link_url}")
-                    elif "/pages/" in link_url:
-                        parts = link_url.split('/pages/')
-                        if len(parts) > 1:
-                            page_id_part = parts[1].split('/')[0]
-                            if page_id_part.isdigit(): page_id = page_id_part
-                            else: logging.warning(f"{indent_str}      Non-numeric page ID segment: {page_id_part} in URL: {link_url}")
-                        else: logging.warning(f"{indent_str}      Could not parse pageId from Confluence URL structure: {link_url}")
-                    
+                if is_confluence_link(link_url):
+                    page_id = linked_page_ids.get(idx)
                     if page_id:
-                        logging.info(f"{indent_str}      Fetching Confluence content for page ID: {page_id}...")
-                        confluence_content = fetch_all_confluence_content_recursive(page_id)
+                        confluence_content = confluence_trees.get(page_id)
                         if confluence_content and isinstance(issue_json["remote_links_data"][idx], dict):
                             issue_json["remote_links_data"][idx]["confluence_content_fetched"] = confluence_content
-                            logging.info(f"{indent_str}      Successfully attached Confluence content for page ID: {page_id}")
+                            logging.info("%s      Successfully attached Confluence content for page ID: %s", indent_str, page_id)
                         elif not confluence_content:
-                             logging.info(f"{indent_str}      No Confluence content found or error for page ID: {page_id}")
+                             logging.info("%s      No Confluence content found or error for page ID: %s", indent_str, page_id)
                     else: logging.warning(f"{indent_str}      Could not determine Confluence page ID from URL: {link_url}")
                 # Google Drive
                 elif GOOGLE_LIBS_AVAILABLE and is_google_drive_link(link_url):
@@ -154,27 +226,31 @@ def process_issue_fully(issue_json, indent_str="", skip_remote=False):
                     if gdrive_service:
                         gdrive_id = extract_google_drive_id(link_url)
                         if gdrive_id:
-                            logging.info(f"{indent_str}      Fetching Google Drive item for ID: {gdrive_id} (from URL: {link_url})...")
-                            gdrive_content = fetch_google_drive_item_recursive(gdrive_service, gdrive_id, visited_ids=set())
+                            logging.info("%s      Fetching Google Drive item for ID: %s (from URL: %s)...", indent_str, gdrive_id, link_url)
+                            with _remote_content_cache_lock:
+                                gdrive_content = _gdrive_item_cache.get(gdrive_id)
+                            if gdrive_content is None:
+                                gdrive_content = fetch_google_drive_item_recursive(gdrive_service, gdrive_id, visited_ids=set())
+                                if gdrive_content and "error" not in gdrive_content:
+                                    with _remote_content_cache_lock:
+                                        gdrive_content = _gdrive_item_cache.setdefault(gdrive_id, gdrive_content)
                             if gdrive_content and isinstance(issue_json["remote_links_data"][idx], dict):
                                 issue_json["remote_links_data"][idx]["gdrive_content_fetched"] = gdrive_content
-                                logging.info(f"{indent_str}      Successfully processed Google Drive link for ID: {gdrive_id}")
+                                logging.info("%s      Successfully processed Google Drive link for ID: %s", indent_str, gdrive_id)
                             elif not gdrive_content:
-                                logging.info(f"{indent_str}      No Google Drive content found or error for ID: {gdrive_id}")
+                                logging.info("%s      No Google Drive content found or error for ID: %s", indent_str, gdrive_id)
                         else: logging.warning(f"{indent_str}      Could not extract Google Drive ID from URL: {link_url}")
                     else: logging.warning(f"{indent_str}      Google Drive service not available, skipping GDrive link: {link_url}")
     
-    # If this issue is an Epic, fetch its children (summaries)
-    # This should only happen once per epic due to globally_processed_issue_keys check.
+    # Collect the Epic's children (summaries) started above
     # Note: The actual *processing* of these children happens when they are picked up by a worker from the queue.
-    if issue_json.get('fields', {}).get('issuetype', {}).get('name') == 'Epic' and issue_key not in globally_processed_issue_keys:
-        logging.info(f"{indent_str}  Epic {issue_key}: Fetching children summaries.")
-        epic_children_list = fetch_epic_children(issue_key) # Returns list of issue JSONs (summaries)
+    if epic_children_future is not None:
+        epic_children_list = epic_children_future.result() # Returns list of issue JSONs (summaries)
         if epic_children_list:
             issue_json["epic_children_data"] = epic_children_list # Store summaries
-            logging.info(f"{indent_str}    Found {len(epic_children_list)} children for Epic {issue_key}.")
+            logging.info("%s    Found %d children for Epic %s.", indent_str, len(epic_children_list), issue_key)
         else:
-            logging.info(f"{indent_str}    No children found for Epic {issue_key}.")
+            logging.info("%s    No children found for Epic %s.", indent_str, issue_key)
     
     globally_processed_issue_keys.add(issue_key)
 
@@ -197,6 +273,24 @@ def get_google_drive_service():
             return None
     return DRIVE_SERVICE
 
+def is_confluence_link(url_string):
+    """Checks if a URL is a Confluence page link."""
+    return "simplifi.atlassian.net/wiki/spaces/" in url_string or "/wiki/pages/" in url_string
+
+# Page ID in a Confluence page URL: .../pages/viewpage.action?pageId=ID or .../pages/ID[/Title]
+_CONFLUENCE_PAGE_ID_RE = re.compile(r'\?pageId=(\d+)|/pages/(\d+)(?:[/?#]|$)')
+
+def confluence_page_id_from_url(link_url):
+    """Extracts the page ID from a Confluence page URL, or returns None."""
+    match = _CONFLUENCE_PAGE_ID_RE.search(link_url)
+    if match:
+        return match.group(1) or match.group(2)
+    return None
+
+# File or folder ID in the common Google Drive URL shapes:
+# /file/d/FILE_ID/edit, /document/d/FILE_ID, /drive/folders/FOLDER_ID, /file/FILE_ID, /open?id=FILE_ID
+_GDRIVE_ID_RE = re.compile(r'(?:/file/(?:d/)?|/d/|/folders/|[?&]id=)([A-Za-z0-9_-]+)')
+
 def is_google_drive_link(url_string):
     """Checks if a URL is a Google Drive link."""
     if not url_string:
@@ -207,43 +301,24 @@ def extract_google_drive_id(url_string):
     """Extracts the file or folder ID from a Google Drive URL."""
     if not url_string:
         return None
-    parts = url_string.split('/')
-    # Common patterns:
-    # /file/d/FILE_ID/edit
-    # /drive/folders/FOLDER_ID
-    # /open?id=FILE_ID
-    if "open?id=" in url_string:
-        return url_string.split('open?id=')[1].split('&')[0]
-    
-    # Find 'd' for files or 'folders' for folders, then take next segment
-    try:
-        if '/d/' in parts:
-            idx = parts.index('d')
-            if idx + 1 < len(parts):
-                return parts[idx+1]
-        elif 'folders' in parts:
-            idx = parts.index('folders')
-            if idx + 1 < len(parts):
-                return parts[idx+1].split('?')[0] # remove query params if any
-        elif 'file' in parts: # another common pattern /file/FILE_ID
-            idx = parts.index('file')
-            if idx + 1 < len(parts):
-                 return parts[idx+1].split('?')[0]
-    except ValueError:
-        logging.debug(f"Element not found during GDrive ID extraction for {url_string}")
-        pass # Element not found
+    match = _GDRIVE_ID_RE.search(url_string)
+    if match:
+        return match.group(1)
     
     logging.warning(f"Could not extract Google Drive ID from URL: {url_string}")
     return None
 
+# Fields requested for a Drive item, both from files().get and per file in a folder listing
+GDRIVE_ITEM_FIELDS = "id, name, mimeType, webViewLink, parents, capabilities, driveId"
+
 def fetch_google_drive_file_metadata(service, file_id):
     """Fetches metadata for a Google Drive file/folder."""
     if not service: return {"error": "Drive service not available"}
-    logging.debug(f"Fetching GDrive metadata for: {file_id}")
+    logging.debug("Fetching GDrive metadata for: %s", file_id)
     GDRIVE_SEMAPHORE.acquire()
     try:
         time.sleep(API_CALL_DELAY_SECONDS) 
-        file_metadata = service.files().get(fileId=file_id, fields="id, name, mimeType, webViewLink, parents, capabilities, driveId", supportsAllDrives=True).execute()
+        file_metadata = service.files().get(fileId=file_id, fields=GDRIVE_ITEM_FIELDS, supportsAllDrives=True).execute()
         return file_metadata
     except HttpError as error:
         logging.error(f"An API error occurred while fetching metadata for GDrive ID {file_id}: {error}")
@@ -289,21 +364,21 @@ def download_google_file_content(service, file_id, mime_type, file_name):
         content_data["error_details"] = "Internal error: download request not prepared."
         return content_data
 
-    logging.info(f"  GDrive: Preparing to download/export {file_name} ({file_id}), mime: {mime_type}")
+    logging.info("  GDrive: Preparing to download/export %s (%s), mime: %s", file_name, file_id, mime_type)
     GDRIVE_SEMAPHORE.acquire()
     try:
         time.sleep(API_CALL_DELAY_SECONDS)
         fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request_object_for_download)
+        downloader = MediaIoBaseDownload(fh, request_object_for_download, chunksize=GDRIVE_DOWNLOAD_CHUNK_SIZE)
         done = False
         while not done:
             _, done = downloader.next_chunk()
-        fh.seek(0)
         try:
-            file_content_str = fh.read().decode('utf-8')
+            # getvalue() hands back the buffer without a seek + read copy
+            file_content_str = fh.getvalue().decode('utf-8')
             content_data["content"] = file_content_str
             content_data["status"] = "success"
-            logging.info(f"  Successfully fetched and decoded GDrive content for {file_name}")
+            logging.info("  Successfully fetched and decoded GDrive content for %s", file_name)
         except UnicodeDecodeError:
             logging.warning(f"  Could not decode GDrive content as UTF-8 for {file_name}. Storing as binary.")
             content_data["content"] = "binary_data_not_shown_or_decoding_error"
@@ -320,11 +395,16 @@ def download_google_file_content(service, file_id, mime_type, file_name):
     finally:
         GDRIVE_SEMAPHORE.release()
 
-def fetch_google_drive_item_recursive(service, item_id, visited_ids=None):
+GDRIVE_FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+def fetch_google_drive_item_recursive(service, item_id, visited_ids=None, metadata=None):
     """
     Fetches a Google Drive item's content (file or folder).
-    If it's a folder, recursively fetches its children.
+    If it's a folder, fetches its whole subtree, breadth first: the listings of all
+    folders on one level go out together in Drive batch requests.
     Keeps track of visited IDs to avoid infinite loops.
+    Pass metadata when the item's fields are already known (e.g. from its
+    parent folder's listing) to skip the files().get call.
     """
     if not GOOGLE_LIBS_AVAILABLE or not service:
         return {"id": item_id, "error": "Google Drive libraries or service not available."}
@@ -333,23 +413,73 @@ def fetch_google_drive_item_recursive(service, item_id, visited_ids=None):
         visited_ids = set()
 
     if item_id in visited_ids:
-        logging.debug(f"Skipping already visited Google Drive item: {item_id}")
+        logging.debug("Skipping already visited Google Drive item: %s", item_id)
         return {"id": item_id, "name": "Already Visited", "status": "skipped_cyclic"}
     
     visited_ids.add(item_id)
 
-    metadata = fetch_google_drive_file_metadata(service, item_id)
+    if metadata is None:
+        metadata = fetch_google_drive_file_metadata(service, item_id)
     if "error" in metadata:
         return metadata # Contains id and error message
 
-    # Log the full metadata received for this item
-    logging.debug(f"  GDrive Item Metadata for {item_id}: {json.dumps(metadata, indent=2)}")
+    fetched_data = _fetch_google_drive_node(service, item_id, metadata)
+    folders_to_list = [fetched_data] if fetched_data["mime_type"] == GDRIVE_FOLDER_MIME_TYPE else []
+    while folders_to_list:
+        for folder in folders_to_list:
+            logging.info("  Listing contents of GDrive folder: %s (%s)", folder["name"], folder["id"])
+        listings = list_google_drive_folders(service, [folder["id"] for folder in folders_to_list])
+
+        next_folders = []
+        for folder in folders_to_list:
+            children_results, error = listings[folder["id"]]
+            if error is not None:
+                if isinstance(error, HttpError):
+                    logging.error(f"  Error listing GDrive folder {folder['name']} ({folder['id']}): {error}")
+                    folder["error"] = f"Error listing folder contents: {error}"
+                    folder["status"] = "error_listing_folder"
+                else:
+                    logging.error(f"  Unexpected error listing GDrive folder {folder['name']} ({folder['id']}): {error}", exc_info=error)
+                    folder["error"] = f"Unexpected error listing folder: {error}"
+                    folder["status"] = "error_listing_folder_unexpected"
+                continue
+
+            # Log the raw response from listing children (only serialized when DEBUG is on)
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(f"  GDrive Raw Children List for folder {folder['id']}: {json.dumps(children_results, indent=2)}")
+
+            children = children_results.get('files', [])
+            if not children:
+                logging.info("  No children found in folder %s", folder["name"])
+                continue
+            logging.info("  Found %d children in folder %s", len(children), folder["name"])
+            for child in children:
+                child_id = child.get("id")
+                if child_id in visited_ids:
+                    logging.debug("Skipping already visited Google Drive item: %s", child_id)
+                    folder["children"].append({"id": child_id, "name": "Already Visited", "status": "skipped_cyclic"})
+                    continue
+                visited_ids.add(child_id)
+                # The listing carries the same fields as a metadata fetch, so children need no get call
+                child_data = _fetch_google_drive_node(service, child_id, child)
+                folder["children"].append(child_data)
+                if child_data["mime_type"] == GDRIVE_FOLDER_MIME_TYPE:
+                    next_folders.append(child_data)
+        folders_to_list = next_folders
+
+    return fetched_data
+
+def _fetch_google_drive_node(service, item_id, metadata):
+    """Build the export entry for one Drive item, downloading its content if it is a file."""
+    # Log the full metadata received for this item (only serialized when DEBUG is on)
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(f"  GDrive Item Metadata for {item_id}: {json.dumps(metadata, indent=2)}")
 
     item_name = metadata.get("name", "Unknown GDrive Item")
     item_mime_type = metadata.get("mimeType")
     item_webview_link = metadata.get("webViewLink")
     
-    logging.info(f"Processing GDrive Item: {item_name} ({item_id}), Type: {item_mime_type}")
+    logging.info("Processing GDrive Item: %s (%s), Type: %s", item_name, item_id, item_mime_type)
 
     fetched_data = {
         "id": item_id,
@@ -361,65 +491,79 @@ def fetch_google_drive_item_recursive(service, item_id, visited_ids=None):
         "status": "processed"
     }
 
-    if item_mime_type == 'application/vnd.google-apps.folder':
-        logging.info(f"  Listing contents of GDrive folder: {item_name} ({item_id})")
-        try:
-            #pageToken = None
-            children_results = service.files().list(
-                q=f"'{item_id}' in parents and trashed=false",
-                fields="nextPageToken, files(id, name, mimeType, capabilities, driveId, webViewLink)", # Request more fields for children
-                supportsAllDrives=True,
-                #pageToken=pageToken # If handling pagination
-                pageSize=100 # Max 1000, but keep reasonable for recursive depth
-            ).execute()
-            
-            # Log the raw response from listing children
-            logging.debug(f"  GDrive Raw Children List for folder {item_id}: {json.dumps(children_results, indent=2)}")
-
-            children = children_results.get('files', [])
-            if children:
-                logging.info(f"  Found {len(children)} children in folder {item_name}")
-                for child in children:
-                    child_id = child.get("id")
-                    #print(f"    Recursively fetching GDrive child: {child.get('name')} ({child_id})")
-                    child_data = fetch_google_drive_item_recursive(service, child_id, visited_ids)
-                    if child_data: # Append even if there was a partial error, error info is in child_data
-                        fetched_data["children"].append(child_data)
-            else:
-                logging.info(f"  No children found in folder {item_name}")
-        except HttpError as error:
-            logging.error(f"  Error listing GDrive folder {item_name} ({item_id}): {error}")
-            fetched_data["error"] = f"Error listing folder contents: {error}"
-            fetched_data["status"] = "error_listing_folder"
-        except Exception as e:
-            logging.error(f"  Unexpected error listing GDrive folder {item_name} ({item_id}): {e}", exc_info=True)
-            fetched_data["error"] = f"Unexpected error listing folder: {e}"
-            fetched_data["status"] = "error_listing_folder_unexpected"
-
-    else: # It's a file
+    if item_mime_type != GDRIVE_FOLDER_MIME_TYPE: # It's a file
         file_content_info = download_google_file_content(service, item_id, item_mime_type, item_name)
         fetched_data.update(file_content_info) # This will add 'content', 'status', and potentially 'error_details'
         if "error" in file_content_info or file_content_info.get("status") != "success":
              fetched_data["status"] = file_content_info.get("status", "fetch_failed")
              if "error_details" in file_content_info : fetched_data["error"] = file_content_info["error_details"]
 
-
     return fetched_data
 
+def list_google_drive_folders(service, folder_ids):
+    """
+    List the children of several Drive folders, GDRIVE_BATCH_SIZE listings per batch request.
+    Returns {folder_id: (files().list response or None, exception or None)}.
+    """
+    listings = {}
+
+    def on_listing(request_id, response, exception):
+        listings[request_id] = (response, exception)
+
+    for batch_start in range(0, len(folder_ids), GDRIVE_BATCH_SIZE):
+        batch_ids = folder_ids[batch_start:batch_start + GDRIVE_BATCH_SIZE]
+        batch = service.new_batch_http_request(callback=on_listing)
+        for folder_id in batch_ids:
+            batch.add(service.files().list(
+                q=f"'{folder_id}' in parents and trashed=false",
+                fields=f"nextPageToken, files({GDRIVE_ITEM_FIELDS})", # Same fields as a metadata fetch
+                supportsAllDrives=True,
+                pageSize=100 # Max 1000, but keep reasonable for recursive depth
+            ), request_id=folder_id)
+        GDRIVE_SEMAPHORE.acquire()
+        try:
+            time.sleep(API_CALL_DELAY_SECONDS)
+            batch.execute()
+        except Exception as e:
+            # The batch call itself failed; report it for every listing that got no callback
+            for folder_id in batch_ids:
+                listings.setdefault(folder_id, (None, e))
+        finally:
+            GDRIVE_SEMAPHORE.release()
+    return listings
+
+# Confluence page trees and Drive items already fetched during this run, keyed by page / item id.
+# Shared design docs are linked from many issues; each is fetched once. Failed fetches are not cached.
+_confluence_tree_cache = {}
+_gdrive_item_cache = {}
+_remote_content_cache_lock = threading.Lock()
+
+# Issues already fetched one by one during this run (with every field), so each is
+# fetched once. Failed fetches are not cached.
+_issue_cache = {}
+_issue_cache_lock = threading.Lock()
+
 def fetch_jira_issue(issue_key):
-    """Fetch a single Jira issue"""
+    """Fetch a single Jira issue, reusing an earlier fetch of the same key in this run"""
+    with _issue_cache_lock:
+        cached_issue = _issue_cache.get(issue_key)
+    if cached_issue is not None:
+        logging.debug("Using cached Jira issue: %s", issue_key)
+        return cached_issue
+
     url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}"
-    auth = HTTPBasicAuth(USERNAME, API_TOKEN)
-    headers = {"Accept": "application/json"}
     params = {'expand': 'changelog'}
     
-    logging.debug(f"Fetching Jira issue: {url} with params: {params}")
+    logging.debug("Fetching Jira issue: %s with params: %s", url, params)
     JIRA_SEMAPHORE.acquire()
     try:
         time.sleep(API_CALL_DELAY_SECONDS) 
-        response = requests.get(url, headers=headers, auth=auth, params=params)
+        response = SESSION.get(url, params=params)
         response.raise_for_status() # Raise an exception for bad status codes
-        return response.json()
+        issue_data = parse_json(response)
+        with _issue_cache_lock:
+            # Keep the first copy if another thread fetched this key concurrently
+            return _issue_cache.setdefault(issue_key, issue_data)
     except requests.exceptions.RequestException as e:
         logging.error(f"Error fetching Jira issue {issue_key}: {e}")
         if hasattr(e, 'response') and e.response is not None:
@@ -428,116 +572,145 @@ def fetch_jira_issue(issue_key):
     finally:
         JIRA_SEMAPHORE.release()
 
-def fetch_subtasks(parent_issue_key):
-    """Fetch all subtasks for a parent issue"""
-    # First get the parent issue to find subtasks
-    parent = fetch_jira_issue(parent_issue_key)
-    
-    if not parent:
-        return []
-    
-    subtasks = []
-    
-    # Get direct subtasks
-    if 'subtasks' in parent['fields'] and parent['fields']['subtasks']:
-        for subtask in parent['fields']['subtasks']:
-            subtask_data = fetch_jira_issue(subtask['key'])
-            if subtask_data:
-                subtasks.append(subtask_data)
-    
-    return subtasks
-
-def fetch_linked_issues(issue_key):
-    """Fetch issues linked to the given issue"""
-    issue = fetch_jira_issue(issue_key)
-    
-    if not issue:
-        return []
-    
-    linked_issues = []
-    
-    if 'issuelinks' in issue['fields'] and issue['fields']['issuelinks']:
-        for link in issue['fields']['issuelinks']:
-            # Check both inward and outward links
-            if 'inwardIssue' in link:
-                linked_issue_data = fetch_jira_issue(link['inwardIssue']['key'])
-                if linked_issue_data:
-                    linked_issues.append(linked_issue_data)
-            
-            if 'outwardIssue' in link:
-                linked_issue_data = fetch_jira_issue(link['outwardIssue']['key'])
-                if linked_issue_data:
-                    linked_issues.append(linked_issue_data)
-    
-    return linked_issues
-
-def search_jira_with_jql(jql_query, context_log_prefix="  "):
-    """ Helper function to search Jira with JQL, handling pagination and semaphore """
-    all_issues = []
-    start_at = 0
-    auth = HTTPBasicAuth(USERNAME, API_TOKEN)
-    headers = {"Accept": "application/json"}
-    url = f"{JIRA_BASE_URL}/rest/api/3/search"
+def subtask_refs(parent):
+    """Subtask stubs (key plus summary, status and a few other fields) listed on a parent issue."""
+    return (parent.get('fields') or {}).get('subtasks') or []
+
+def linked_issue_refs(issue):
+    """Stubs (key plus summary, status and a few other fields) for the issues linked to an issue."""
+    refs = []
+    for link in (issue.get('fields') or {}).get('issuelinks') or []:
+        # Check both inward and outward links
+        if 'inwardIssue' in link:
+            refs.append(link['inwardIssue'])
+        if 'outwardIssue' in link:
+            refs.append(link['outwardIssue'])
+    return refs
+
+def iter_jira_search(jql_query, context_log_prefix="  ", fields=None):
+    """Yield the issues matching a JQL query page by page, handling pagination and semaphore.
+
+    Each page is handed to the caller before the next one is requested, so
+    consumers that don't need a list never hold more than one page of results.
+    """
+    issue_count = 0
+    next_page_token = None
+    url = f"{JIRA_BASE_URL}/rest/api/3/search/jql"
 
     while True:
         params = {
             'jql': jql_query,
-            'startAt': start_at,
             'maxResults': MAX_RESULTS_PER_JIRA_PAGE,
-            'fields': '*all',
+            'fields': fields or JIRA_SEARCH_FIELDS,
             'expand': 'changelog'
         }
-        logging.info(f"{context_log_prefix}Fetching JQL page: startAt={start_at}, maxResults={MAX_RESULTS_PER_JIRA_PAGE} for JQL: {jql_query[:50]}... with params {params}")
+        if next_page_token:
+            params['nextPageToken'] = next_page_token
+        logging.info("%sFetching JQL page %s: maxResults=%d for JQL: %s...", context_log_prefix, '(continued)' if next_page_token else '(first)', MAX_RESULTS_PER_JIRA_PAGE, jql_query[:50])
         JIRA_SEMAPHORE.acquire()
         try:
             time.sleep(API_CALL_DELAY_SECONDS)
-            response = requests.get(url, headers=headers, auth=auth, params=params)
+            response = SESSION.get(url, params=params)
             response.raise_for_status()
-            data = response.json()
+            data = parse_json(response)
             current_page_issues = data.get('issues', [])
-            all_issues.extend(current_page_issues)
-            total_issues_on_server = data.get('total', 0)
-            if not current_page_issues or (start_at + len(current_page_issues)) >= total_issues_on_server:
-                logging.info(f"{context_log_prefix}Finished fetching for JQL ({jql_query[:50]}...). Total issues retrieved: {len(all_issues)}")
-                break
-            start_at += len(current_page_issues)
+            next_page_token = data.get('nextPageToken')
+            if not issue_count and next_page_token and len(current_page_issues) < MAX_RESULTS_PER_JIRA_PAGE:
+                # Jira caps page size for heavier field/expand sets; the token paging follows its size
+                logging.info("%sJira returned %d issues for a requested page of %d; continuing at the server's page size.", context_log_prefix, len(current_page_issues), MAX_RESULTS_PER_JIRA_PAGE)
+            is_last_page = data.get('isLast') or not next_page_token or not current_page_issues
         except requests.exceptions.RequestException as e:
-            logging.error(f"{context_log_prefix}Error fetching page for JQL '{jql_query}' (startAt={start_at}): {e}")
+            logging.error(f"{context_log_prefix}Error fetching page for JQL '{jql_query}' (after {issue_count} issues): {e}")
             if hasattr(e, 'response') and e.response is not None:
                 logging.error(f"{context_log_prefix}Response content: {e.response.text}")
             break
         finally:
             JIRA_SEMAPHORE.release()
-    return all_issues
+
+        # Yield outside the semaphore so a slow consumer never holds a Jira slot
+        issue_count += len(current_page_issues)
+        yield from current_page_issues
+        if is_last_page:
+            logging.info("%sFinished fetching for JQL (%s...). Total issues retrieved: %d", context_log_prefix, jql_query[:50], issue_count)
+            break
+
+def search_jira_with_jql(jql_query, context_log_prefix="  ", fields=None):
+    """ Helper function to search Jira with JQL, returning every matching issue as a list """
+    return list(iter_jira_search(jql_query, context_log_prefix=context_log_prefix, fields=fields))
+
+def fetch_issues_by_keys(issue_keys):
+    """Fetch issues for the given keys through Jira's bulk fetch endpoint, ISSUE_KEY_BATCH_SIZE keys per call.
+
+    Issues carry the same fields as JQL search results. Returns them in the order
+    of issue_keys, dropping any Jira could not return (deleted, moved or hidden).
+    """
+    unique_keys = list(dict.fromkeys(issue_keys))
+    fetched_by_key = {}
+    for batch_start in range(0, len(unique_keys), ISSUE_KEY_BATCH_SIZE):
+        for issue_data in _bulk_fetch_issues(unique_keys[batch_start:batch_start + ISSUE_KEY_BATCH_SIZE]):
+            fetched_by_key[issue_data.get('key')] = issue_data
+    return [fetched_by_key[key] for key in issue_keys if key in fetched_by_key]
+
+def _bulk_fetch_issues(issue_keys):
+    """Fetch up to ISSUE_KEY_BATCH_SIZE issues in one call.
+
+    Unlike a `key in (...)` search, which Jira rejects outright when any key is
+    missing, keys it cannot return come back as issueErrors and the rest still load.
+    """
+    url = f"{JIRA_BASE_URL}/rest/api/3/issue/bulkfetch"
+    payload = {
+        'issueIdsOrKeys': issue_keys,
+        'fields': JIRA_SEARCH_FIELDS.split(','),
+        'expand': ['changelog']
+    }
+
+    logging.debug("Bulk fetching %d Jira issue(s)", len(issue_keys))
+    JIRA_SEMAPHORE.acquire()
+    try:
+        time.sleep(API_CALL_DELAY_SECONDS)
+        response = SESSION.post(url, json=payload)
+        response.raise_for_status()
+        data = parse_json(response)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error bulk fetching Jira issues {', '.join(issue_keys)}: {e}")
+        if hasattr(e, 'response') and e.response is not None:
+            logging.error(f"Response content: {e.response.text}")
+        return []
+    finally:
+        JIRA_SEMAPHORE.release()
+
+    issue_errors = data.get('issueErrors') or []
+    if issue_errors:
+        # Stale links to deleted or restricted issues are routine, so this is not an error
+        logging.debug("Bulk fetch could not return %d of %d issue(s): %s", len(issue_errors), len(issue_keys), issue_errors)
+    return data.get('issues', [])
 
 def fetch_issues_by_jql(jql_query):
-    """Fetch issues based on a JQL query, handling pagination."""
+    """Fetch issues based on a JQL query, handling pagination. Returns an iterator over the issues."""
     logging.info(f"Fetching issues with JQL: {jql_query}")
-    return search_jira_with_jql(jql_query, context_log_prefix="  JQL Query - ")
+    return iter_jira_search(jql_query, context_log_prefix="  JQL Query - ")
 
 def fetch_epic_children(epic_key):
     """Fetch all child issues for a given epic key, handling pagination."""
-    logging.info(f"    Fetching children for Epic: {epic_key}...")
+    logging.info("    Fetching children for Epic: %s...", epic_key)
     jql = f'(parent = "{epic_key}" OR "Epic Link" = "{epic_key}") AND project = {JIRA_DEFAULT_PROJECT_KEY}'
     return search_jira_with_jql(jql, context_log_prefix=f"    Epic Children {epic_key} - ")
 
 def fetch_remote_links(issue_key):
     """Fetch remote links (e.g., Confluence pages) for a given issue"""
     url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}/remotelink"
-    auth = HTTPBasicAuth(USERNAME, API_TOKEN)
-    headers = {"Accept": "application/json"}
     
-    logging.debug(f"Fetching remote links for: {issue_key}")
+    logging.debug("Fetching remote links for: %s", issue_key)
     JIRA_SEMAPHORE.acquire()
     try:
         time.sleep(API_CALL_DELAY_SECONDS) 
-        response = requests.get(url, headers=headers, auth=auth)
+        response = SESSION.get(url)
         response.raise_for_status() 
-        return response.json()
+        return parse_json(response)
     except requests.exceptions.RequestException as e:
         # It's common for issues to have no remote links, so don't log an error for 404 specifically
         if hasattr(e, 'response') and e.response is not None and e.response.status_code == 404:
-            logging.debug(f"No remote links found for {issue_key} (404). This is common.")
+            logging.debug("No remote links found for %s (404). This is common.", issue_key)
             return []
         logging.warning(f"Error fetching remote links for {issue_key}: {e}")
         if hasattr(e, 'response') and e.response is not None:
@@ -564,32 +737,64 @@ def print_issue_summary(issue):
     logging.info(f"Updated: {fields.get('updated', 'N/A')[:10]}")
     logging.info("-" * 50)
 
+def _encode_json(obj, depth=0):
+    """Encode one value as indented JSON bytes, nested `depth` levels into the document."""
+    if orjson is not None:
+        encoded = orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        encoded = json.dumps(obj, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+    return encoded.replace(b"\n", b"\n" + b"  " * depth) if depth else encoded
+
+def _encode_json_line(obj):
+    """Encode one value as a single newline-terminated JSON line (JSONL record)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(obj, ensure_ascii=False, default=str) + "\n").encode('utf-8')
+
 def save_to_json(data, filename):
-    """Save data to JSON file.""" # Simplified docstring
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+    """Save data to JSON file, encoding with orjson when it is installed.
+
+    The items of top-level lists (the processed issues, for an export) are encoded
+    and written one at a time, so the whole document never sits in memory as one
+    serialized buffer. The layout matches json.dump(data, indent=2).
+    """
+    with open(filename, 'wb') as f:
+        f.write(b"{")
+        for index, (key, value) in enumerate(data.items()):
+            f.write(b"," if index else b"")
+            f.write(b"\n  " + _encode_json(str(key)) + b": ")
+            if isinstance(value, list) and value:
+                f.write(b"[")
+                for item_index, item in enumerate(value):
+                    f.write((b",\n    " if item_index else b"\n    ") + _encode_json(item, depth=2))
+                f.write(b"\n  ]")
+            else:
+                f.write(_encode_json(value, depth=1))
+        f.write(b"\n}" if data else b"}")
     logging.info(f"✅ Saved JSON data to: {filename}")
 
 def fetch_confluence_page_content(page_id):
     """Fetch content of a Confluence page."""
-    url = f"{CONFLUENCE_BASE_URL}/rest/api/content/{page_id}?expand=body.storage,space,version"
-    auth = HTTPBasicAuth(USERNAME, API_TOKEN)
-    headers = {"Accept": "application/json"}
+    return _fetch_confluence_page(page_id)[0]
+
+def _fetch_confluence_page(page_id, with_children=False):
+    """
+    Fetch content of a Confluence page, optionally listing its children in the same call.
+    Returns (page data or error dict, child summaries); the summaries are None unless
+    with_children was set and the inline list is complete.
+    """
+    url = f"{CONFLUENCE_BASE_URL}/rest/api/content/{page_id}?expand={SLIM_EXPAND}"
+    if with_children:
+        url += ",children.page"
 
-    logging.debug(f"Fetching Confluence page: {page_id}")
+    logging.debug("Fetching Confluence page: %s", page_id)
     CONFLUENCE_SEMAPHORE.acquire()
     try:
         time.sleep(API_CALL_DELAY_SECONDS) 
-        response = requests.get(url, headers=headers, auth=auth)
+        response = SESSION.get(url)
         response.raise_for_status()  
-        page_data = response.json()
-        return {
-            "title": page_data.get("title"),
-            "url": page_data.get("_links", {}).get("webui"),
-            "content": page_data.get("body", {}).get("storage", {}).get("value"),
-            "space": page_data.get("space", {}).get("key"),
-            "version": page_data.get("version", {}).get("number")
-        }
+        page_data = parse_json(response)
+        return _parse_confluence_page(page_data), _inline_confluence_child_pages(page_data) if with_children else None
     except requests.exceptions.RequestException as e:
         logging.error(f"Error fetching Confluence page {page_id}: {e}")
         error_details = {"error": str(e), "id": page_id}
@@ -599,24 +804,47 @@ def fetch_confluence_page_content(page_id):
                 error_details["details"] = e.response.json()
             except ValueError:
                 error_details["details"] = e.response.text
-        return error_details
+        return error_details, None
     finally:
         CONFLUENCE_SEMAPHORE.release()
 
+def _parse_confluence_page(page_data):
+    """Pick the exported fields out of an expanded Confluence content entity."""
+    return {
+        "title": page_data.get("title"),
+        "url": page_data.get("_links", {}).get("webui"),
+        "content": page_data.get("body", {}).get("storage", {}).get("value"),
+        "space": page_data.get("space", {}).get("key"),
+        "version": page_data.get("version", {}).get("number")
+    }
+
+def _inline_confluence_child_pages(page_data):
+    """Return child summaries from an expanded children.page, or None if it was truncated."""
+    children = page_data.get("children", {}).get("page")
+    if children is None:
+        return None
+    results = children.get("results", [])
+    # The inline list is a single page of results; more pages need the listing endpoint
+    if "next" in children.get("_links", {}) or len(results) >= children.get("limit", len(results) + 1):
+        return None
+    return [{
+        "id": child.get("id"),
+        "title": child.get("title"),
+        "url": child.get("_links", {}).get("webui")
+    } for child in results]
+
 def fetch_confluence_child_pages(page_id):
     """Fetch child pages of a Confluence page."""
     url = f"{CONFLUENCE_BASE_URL}/rest/api/content/{page_id}/child/page"
-    auth = HTTPBasicAuth(USERNAME, API_TOKEN)
-    headers = {"Accept": "application/json"}
     
     child_pages_summary = []
-    logging.debug(f"Fetching Confluence child pages for: {page_id}")
+    logging.debug("Fetching Confluence child pages for: %s", page_id)
     CONFLUENCE_SEMAPHORE.acquire()
     try:
         time.sleep(API_CALL_DELAY_SECONDS) 
-        response = requests.get(url, headers=headers, auth=auth)
+        response = SESSION.get(url)
         response.raise_for_status()
-        children_data = response.json()
+        children_data = parse_json(response)
         for child in children_data.get("results", []):
             child_pages_summary.append({
                 "id": child.get("id"),
@@ -634,47 +862,244 @@ def fetch_all_confluence_content_recursive(page_id, visited_pages=None):
     """
     Fetches a Confluence page's content and recursively fetches its children.
     Keeps track of visited pages to avoid infinite loops in case of unexpected structures.
+    The subtree is normally read through a paginated CQL descendant search and rebuilt
+    from each page's ancestors; if that search fails, it is crawled page by page.
     """
     if visited_pages is None:
         visited_pages = set()
 
     if page_id in visited_pages:
-        logging.debug(f"Skipping already visited Confluence page: {page_id}")
+        logging.debug("Skipping already visited Confluence page: %s", page_id)
         return None
     
     visited_pages.add(page_id)
 
-    page_content_data = fetch_confluence_page_content(page_id)
-    if not page_content_data or "error" in page_content_data: # If fetching failed or returned an error structure
-        return {"id": page_id, "error": page_content_data.get("error", "Failed to fetch content")}
+    # The root is not its own descendant, so fetch it alongside the search
+    root_future = CONFLUENCE_EXECUTOR.submit(fetch_confluence_page_content, page_id)
+    descendants = fetch_confluence_descendants_bulk(page_id)
+    page_content_data = root_future.result()
+    if descendants is None:
+        logging.info(f"  CQL search unavailable for Confluence page {page_id}; crawling children page by page")
+        return _crawl_confluence_tree(page_id, visited_pages)
+    if not page_content_data or "error" in page_content_data:
+        return {"id": page_id, "error": (page_content_data or {}).get("error", "Failed to fetch content")}
+
+    children_of = {}
+    for entry in descendants:
+        children_of.setdefault(entry["parent_id"], []).append(entry)
+
+    # Search results come back in relevance order; restore page-tree order
+    for siblings in children_of.values():
+        if all(isinstance(entry["position"], int) for entry in siblings):
+            siblings.sort(key=lambda entry: entry["position"])
+
+    root = {"id": page_id, **page_content_data, "children": []}
+    nodes_to_attach = [root]
+    for node in nodes_to_attach:
+        for entry in children_of.get(node["id"], []):
+            child = entry["page"]
+            if not child["id"] or child["id"] in visited_pages:
+                continue
+            visited_pages.add(child["id"])
+            node["children"].append(child)
+            nodes_to_attach.append(child)
+    return root
+
+def fetch_confluence_descendants_bulk(root_id):
+    """
+    Fetch every descendant page of a Confluence page through CQL search.
+    Returns a list of {"page", "parent_id", "position"} entries, where page has the same
+    fields as a crawled node, or None if the search failed (e.g. CQL is disabled).
+    """
+    descendants = search_confluence_pages(f"ancestor={root_id} and type=page", f"descendants of Confluence page {root_id}")
+    if descendants is not None:
+        logging.info(f"  Found {len(descendants)} descendants for Confluence page {root_id}")
+    return descendants
 
-    # page_content_data will now have title, url, content, space, version
-    fetched_data = {
-        "id": page_id,
-        "title": page_content_data.get("title"),
-        "url": page_content_data.get("url"),
-        "content": page_content_data.get("content"),
-        "space": page_content_data.get("space"),
-        "version": page_content_data.get("version"),
-        "children": []
-    }
+def search_confluence_pages(cql, description):
+    """
+    Run a CQL content search with the slim expand plus ancestors and position,
+    following the `_links.next` cursor until the last page.
+    Returns a list of {"page", "parent_id", "position"} entries, or None if the search
+    failed or a page brought no new results.
+    """
+    url = f"{CONFLUENCE_BASE_URL}/rest/api/content/search"
+    params = {"cql": cql, "expand": SLIM_SEARCH_EXPAND, "limit": CONFLUENCE_SEARCH_PAGE_SIZE}
+    entries = []
+    seen_ids = set()
+    while url:
+        logging.debug("Searching %s (%d results so far)", description, len(entries))
+        CONFLUENCE_SEMAPHORE.acquire()
+        try:
+            time.sleep(API_CALL_DELAY_SECONDS)
+            response = SESSION.get(url, params=params)
+            response.raise_for_status()
+            data = parse_json(response)
+        except requests.exceptions.RequestException as e:
+            logging.warning(f"Error searching {description}: {e}")
+            return None
+        finally:
+            CONFLUENCE_SEMAPHORE.release()
 
-    child_pages_summary = fetch_confluence_child_pages(page_id)
-    if child_pages_summary:
-        logging.info(f"  Found {len(child_pages_summary)} children for Confluence page {page_id} ({page_content_data.get('title')})")
-        for child_summary in child_pages_summary:
-            child_id = child_summary.get("id")
-            if child_id:
-                logging.info(f"    Fetching child Confluence page: {child_id} ({child_summary.get('title')})...")
-                # Recursively fetch child content
-                child_full_content = fetch_all_confluence_content_recursive(child_id, visited_pages)
-                if child_full_content: # Only add if successfully fetched
-                    fetched_data["children"].append(child_full_content)
-    
-    return fetched_data
+        new_results = [page_data for page_data in data.get("results", []) if page_data.get("id") not in seen_ids]
+        next_url = confluence_next_page_url(data.get("_links") or {})
+        if next_url and not new_results:
+            # A cursor that keeps serving known pages would never end; callers fall back to crawling
+            logging.warning(f"Search for {description} stopped returning new pages")
+            return None
+        for page_data in new_results:
+            seen_ids.add(page_data.get("id"))
+            ancestors = page_data.get("ancestors") or []
+            entries.append({
+                "page": {"id": page_data.get("id"), **_parse_confluence_page(page_data), "children": []},
+                "parent_id": ancestors[-1].get("id") if ancestors else None,
+                "position": (page_data.get("extensions") or {}).get("position")
+            })
+        # The next link carries the query, expand and cursor itself
+        url, params = next_url, None
+    return entries
+
+def confluence_next_page_url(links):
+    """Absolute URL of a Confluence response's `_links.next`, or None on the last page."""
+    next_link = links.get("next")
+    if not next_link:
+        return None
+    # v2 links already start with the context path (/wiki); v1 links are relative to _links.base
+    context = links.get("context", urlparse(CONFLUENCE_BASE_URL).path)
+    if urlparse(next_link).scheme or (context and next_link.startswith(context + "/")):
+        return urljoin(CONFLUENCE_BASE_URL, next_link)
+    return (links.get("base") or CONFLUENCE_BASE_URL) + next_link
+
+def fetch_confluence_trees_bulk(page_ids):
+    """
+    Fetch several Confluence page trees at once, as {page_id: tree} in the shape
+    fetch_all_confluence_content_recursive returns.
+    Trees already fetched during this run are reused from the cache.
+    """
+    page_ids = list(dict.fromkeys(page_ids))
+    with _remote_content_cache_lock:
+        trees = {page_id: _confluence_tree_cache[page_id] for page_id in page_ids if page_id in _confluence_tree_cache}
+    missing_ids = [page_id for page_id in page_ids if page_id not in trees]
+    if missing_ids:
+        fetched_trees = _fetch_confluence_trees(missing_ids)
+        with _remote_content_cache_lock:
+            for page_id, tree in fetched_trees.items():
+                if tree and "error" not in tree:
+                    # Keep the first copy if another thread fetched this page concurrently
+                    tree = _confluence_tree_cache.setdefault(page_id, tree)
+                trees[page_id] = tree
+    return {page_id: trees[page_id] for page_id in page_ids}
+
+def _fetch_confluence_trees(page_ids):
+    """
+    Fetch the trees of distinct Confluence pages, as {page_id: tree}.
+    The roots are read with one `id in (...)` search and all their descendants with one
+    `ancestor in (...)` search per batch of CONFLUENCE_ID_BATCH_SIZE ids, instead of two
+    requests per page. A single page, a failed search, or a root the search did not
+    return goes through fetch_all_confluence_content_recursive.
+    """
+    if len(page_ids) < 2:
+        return {page_id: fetch_all_confluence_content_recursive(page_id) for page_id in page_ids}
+
+    root_pages = {}
+    descendants = []
+    for batch_start in range(0, len(page_ids), CONFLUENCE_ID_BATCH_SIZE):
+        batch = page_ids[batch_start:batch_start + CONFLUENCE_ID_BATCH_SIZE]
+        id_list = ",".join(batch)
+        roots_future = CONFLUENCE_EXECUTOR.submit(search_confluence_pages, f"id in ({id_list})",
+                                                  f"{len(batch)} linked Confluence pages")
+        batch_descendants = search_confluence_pages(f"ancestor in ({id_list}) and type=page",
+                                                    f"descendants of {len(batch)} linked Confluence pages")
+        batch_roots = roots_future.result()
+        if batch_roots is None or batch_descendants is None:
+            logging.info("  CQL search unavailable for linked Confluence pages; fetching them one by one")
+            return {page_id: fetch_all_confluence_content_recursive(page_id) for page_id in page_ids}
+        root_pages.update((entry["page"]["id"], entry["page"]) for entry in batch_roots)
+        descendants.extend(batch_descendants)
+
+    # Every page has one parent, so one map serves all the trees, even nested ones
+    children_of = {}
+    for entry in {entry["page"]["id"]: entry for entry in descendants}.values():
+        children_of.setdefault(entry["parent_id"], []).append(entry)
+    # Search results come back in relevance order; restore page-tree order
+    for siblings in children_of.values():
+        if all(isinstance(entry["position"], int) for entry in siblings):
+            siblings.sort(key=lambda entry: entry["position"])
+
+    trees = {}
+    for page_id in page_ids:
+        if page_id not in root_pages:
+            trees[page_id] = fetch_all_confluence_content_recursive(page_id)
+            continue
+        # Fresh node dicts per tree, so trees that share a subtree don't share children lists
+        root = {**root_pages[page_id], "children": []}
+        visited_pages = {page_id}
+        nodes_to_attach = [root]
+        for node in nodes_to_attach:
+            for entry in children_of.get(node["id"], []):
+                child = {**entry["page"], "children": []}
+                if not child["id"] or child["id"] in visited_pages:
+                    continue
+                visited_pages.add(child["id"])
+                node["children"].append(child)
+                nodes_to_attach.append(child)
+        trees[page_id] = root
+    logging.info(f"  Fetched {len(trees)} linked Confluence page trees ({len(descendants)} descendant pages)")
+    return trees
+
+def _crawl_confluence_tree(page_id, visited_pages):
+    """
+    Crawl a Confluence page tree page by page. Sibling pages are fetched in parallel on
+    CONFLUENCE_EXECUTOR; the calling thread schedules work as results arrive and stitches
+    the tree, so workers never wait on each other.
+    """
+    nodes = {}
+    child_ids = {}
+    pending = {CONFLUENCE_EXECUTOR.submit(fetch_confluence_page_and_children, page_id): page_id}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            current_id = pending.pop(future)
+            fetched_data, child_pages_summary = future.result()
+            nodes[current_id] = fetched_data
+            if "error" in fetched_data:
+                continue
+
+            child_ids[current_id] = []
+            if child_pages_summary:
+                logging.info("  Found %d children for Confluence page %s (%s)", len(child_pages_summary), current_id, fetched_data.get('title'))
+            for child_summary in child_pages_summary:
+                child_id = child_summary.get("id")
+                if not child_id:
+                    continue
+                if child_id in visited_pages:
+                    logging.debug("Skipping already visited Confluence page: %s", child_id)
+                    continue
+                visited_pages.add(child_id)
+                logging.info("    Fetching child Confluence page: %s (%s)...", child_id, child_summary.get('title'))
+                child_ids[current_id].append(child_id)
+                pending[CONFLUENCE_EXECUTOR.submit(fetch_confluence_page_and_children, child_id)] = child_id
+
+    # Children keep their listing order regardless of completion order
+    for parent_id, kids in child_ids.items():
+        nodes[parent_id]["children"] = [nodes[kid] for kid in kids]
+    return nodes[page_id]
+
+def fetch_confluence_page_and_children(page_id):
+    """Fetch one Confluence page and, if that succeeded, its child page summaries (inline when possible)."""
+    page_content_data, child_pages_summary = _fetch_confluence_page(page_id, with_children=True)
+    if not page_content_data or "error" in page_content_data: # If fetching failed or returned an error structure
+        return {"id": page_id, "error": (page_content_data or {}).get("error", "Failed to fetch content")}, []
+
+    # page_content_data has title, url, content, space, version
+    fetched_data = {"id": page_id, **page_content_data, "children": []}
+    if child_pages_summary is None:
+        # Inline list was truncated (or missing); use the listing endpoint
+        child_pages_summary = fetch_confluence_child_pages(page_id)
+    return fetched_data, child_pages_summary
 
 def fetch_issues_by_project(project_key):
-    """Fetch all issues for a given project."""
+    """Fetch all issues for a given project. Returns an iterator over the issues."""
     logging.info(f"Fetching all issues for project: {project_key}")
     # Construct JQL for project issues
     jql = f'project = "{project_key}" ORDER BY created DESC'
@@ -688,7 +1113,7 @@ def worker_process_issue(issue_obj_raw, skip_remote, issues_processing_queue, ma
         return current_issue_key, "skipped_no_key"
 
     try:
-        logging.info(f"Worker: Starting processing for {current_issue_key}")
+        logging.info("Worker: Starting processing for %s", current_issue_key)
         
         # process_issue_fully enriches the issue_obj_raw in place
         # It uses its own globally_processed_issue_keys set for its internal deduplication of remote link/epic child fetching.
@@ -702,37 +1127,46 @@ def worker_process_issue(issue_obj_raw, skip_remote, issues_processing_queue, ma
         # --- Queue related items --- 
         related_to_queue = [] 
 
-        # 1. Subtasks (fetch_subtasks returns full issue JSONs)
-        subtask_summaries = fetch_subtasks(current_issue_key)
-        if subtask_summaries:
+        # 1. Subtasks and 2. Linked Issues
+        # Their keys and summaries come from the stubs on this issue. A key is claimed in
+        # keys_submitted_to_executor_set before anything is fetched, so only issues no
+        # worker has processed or queued yet are fetched in full; known ones are just recorded.
+        # Subtasks and linked issues are fetched together, in one bulk fetch call.
+        refs_source = issue_obj_raw
+        source_fields = issue_obj_raw.get('fields') or {}
+        if 'subtasks' not in source_fields or 'issuelinks' not in source_fields:
+            refs_source = fetch_jira_issue(current_issue_key) or issue_obj_raw
+        related_refs = (("subtasks_data", "subtask", subtask_refs(refs_source)),
+                        ("linked_issues_data", "linked issue", linked_issue_refs(refs_source)))
+        keys_to_fetch = []
+        with map_and_queue_lock:
+            for _, _, refs in related_refs:
+                for ref in refs:
+                    ref_key = ref.get('key')
+                    if ref_key and ref_key not in keys_submitted_to_executor_set: # Also covers every processed key
+                        keys_submitted_to_executor_set.add(ref_key)
+                        keys_to_fetch.append(ref_key)
+        fetched_by_key = {issue['key']: issue for issue in fetch_issues_by_keys(keys_to_fetch)}
+        unfetched_keys = set(keys_to_fetch).difference(fetched_by_key)
+        if unfetched_keys:
+            # Release the claim so another parent linking to the same issue can try again
             with map_and_queue_lock:
-                if "subtasks_data" not in master_issues_map[current_issue_key]: 
-                    master_issues_map[current_issue_key]["subtasks_data"] = []
-            for sub_summary in subtask_summaries:
-                sub_key = sub_summary.get('key')
-                if sub_key:
-                    with map_and_queue_lock:
-                        master_issues_map[current_issue_key]["subtasks_data"].append({"key": sub_key, "summary": sub_summary.get('fields',{}).get('summary')})
-                        if sub_key not in master_issues_map and sub_key not in keys_submitted_to_executor_set:
-                            related_to_queue.append(sub_summary)
-                            keys_submitted_to_executor_set.add(sub_key)
-                            logging.info(f"Worker ({current_issue_key}): Queued subtask {sub_key}")
-        
-        # 2. Linked Issues (fetch_linked_issues returns full issue JSONs)
-        linked_issues_summaries = fetch_linked_issues(current_issue_key)
-        if linked_issues_summaries:
+                keys_submitted_to_executor_set.difference_update(unfetched_keys)
+        for data_field, label, refs in related_refs:
+            if not refs:
+                continue
             with map_and_queue_lock:
-                if "linked_issues_data" not in master_issues_map[current_issue_key]: 
-                    master_issues_map[current_issue_key]["linked_issues_data"] = []
-            for linked_summary in linked_issues_summaries:
-                linked_key = linked_summary.get('key')
-                if linked_key:
-                    with map_and_queue_lock:
-                        master_issues_map[current_issue_key]["linked_issues_data"].append({"key": linked_key, "summary": linked_summary.get('fields',{}).get('summary')})
-                        if linked_key not in master_issues_map and linked_key not in keys_submitted_to_executor_set:
-                            related_to_queue.append(linked_summary)
-                            keys_submitted_to_executor_set.add(linked_key)
-                            logging.info(f"Worker ({current_issue_key}): Queued linked issue {linked_key}")
+                for ref in refs:
+                    ref_key = ref.get('key')
+                    if not ref_key or ref_key in unfetched_keys:
+                        continue # Issues that could not be fetched are left out, as before
+                    related_issue = fetched_by_key.pop(ref_key, None)
+                    summary_source = related_issue or ref
+                    master_issues_map[current_issue_key].setdefault(data_field, []).append(
+                        {"key": ref_key, "summary": (summary_source.get('fields') or {}).get('summary')})
+                    if related_issue is not None:
+                        related_to_queue.append(related_issue)
+                        logging.info("Worker (%s): Queued %s %s", current_issue_key, label, ref_key)
 
         # 3. Epic Children (already part of issue_obj_raw["epic_children_data"] if it was an epic)
         # These are full issue objects from search result by fetch_epic_children
@@ -741,16 +1175,16 @@ def worker_process_issue(issue_obj_raw, skip_remote, issues_processing_queue, ma
                 child_key = child_summary.get('key')
                 if child_key:
                     with map_and_queue_lock:
-                        if child_key not in master_issues_map and child_key not in keys_submitted_to_executor_set:
+                        if child_key not in keys_submitted_to_executor_set: # Also covers every processed key
                             related_to_queue.append(child_summary) 
                             keys_submitted_to_executor_set.add(child_key)
-                            logging.info(f"Worker ({current_issue_key}): Queued epic child {child_key}")
+                            logging.info("Worker (%s): Queued epic child %s", current_issue_key, child_key)
         
         # Add all newly identified related items to the main processing queue
         for item in related_to_queue:
             issues_processing_queue.put(item)
 
-        logging.info(f"Worker: Finished processing for {current_issue_key}. Queued {len(related_to_queue)} related items.")
+        logging.info("Worker: Finished processing for %s. Queued %d related items.", current_issue_key, len(related_to_queue))
         return current_issue_key, "success"
 
     except Exception as e:
@@ -785,6 +1219,7 @@ def main():
             logging.warning("Failed to initialize Google Drive Service. GDrive fetching will be skipped.")
     
     initial_issues_to_process = []
+    no_issues_message = "No issues found to process. Exiting."
     fetch_mode = args.mode
     fetch_identifier = args.query 
 
@@ -804,10 +1239,8 @@ def main():
         if not jql:
             logging.error("No JQL query provided with --query for jql mode. Exiting.")
             return
-        initial_issues_to_process = fetch_issues_by_jql(jql) # Basic delay will be added inside this func
-        if not initial_issues_to_process:
-            logging.error(f"No issues found for JQL: {jql}. Exiting.")
-            return
+        initial_issues_to_process = fetch_issues_by_jql(jql) # Pages are fetched as the queue is filled below
+        no_issues_message = f"No issues found for JQL: {jql}. Exiting."
         if len(jql) > 50: 
             import hashlib
             fetch_identifier = "jql_" + hashlib.md5(jql.encode()).hexdigest()[:10]
@@ -819,14 +1252,34 @@ def main():
         if not project_key:
             logging.error("No project key provided with --query for project mode. Exiting.")
             return
-        initial_issues_to_process = fetch_issues_by_project(project_key) # Basic delay will be added inside this func
+        initial_issues_to_process = fetch_issues_by_project(project_key) # Pages are fetched as the queue is filled below
         fetch_identifier = project_key 
-        if not initial_issues_to_process:
-            logging.error(f"No issues found for project {project_key}. Exiting.")
-            return
+        no_issues_message = f"No issues found for project {project_key}. Exiting."
+
+    # Thread-safe queue for issues to be processed by workers
+    issues_processing_queue = queue.Queue()
+    # Every key ever added to the queue. Keys are claimed here before they are queued, so each
+    # issue is queued exactly once, and every key in master_issues_map is also in this set:
+    # one membership check against it answers "already processed or queued?"
+    keys_submitted_to_executor_set = set() 
+
+    # Populate initial queue and submitted set straight from the search pages,
+    # so the results are never also collected into an intermediate list
+    initial_issue_count = 0
+    for issue_obj in initial_issues_to_process:
+        initial_issue_count += 1
+        key = issue_obj.get('key')
+        if not key:
+            logging.warning("Initial issue object missing a key, cannot queue.")
+        elif key not in keys_submitted_to_executor_set: # Paged results can repeat an issue
+            issues_processing_queue.put(issue_obj)
+            keys_submitted_to_executor_set.add(key)
+    if not initial_issue_count:
+        logging.error(no_issues_message)
+        return
 
     logging.info(f"\nStarting Jira data fetch based on mode='{fetch_mode}', query/identifier='{fetch_identifier}', skip_remote_content={args.skip_remote_content}")
-    logging.info(f"Found {len(initial_issues_to_process)} initial issue(s) to process.")
+    logging.info(f"Found {initial_issue_count} initial issue(s) to process.")
     logging.info("=" * 60)
     
     all_data = {
@@ -836,59 +1289,50 @@ def main():
             "skip_remote_content": args.skip_remote_content,
             "exported_at": datetime.now().isoformat(),
             "base_url": JIRA_BASE_URL,
-            "total_initial_issues": len(initial_issues_to_process)
+            "total_initial_issues": initial_issue_count
         },
         "processed_issues_data": []
     }
     
     master_issues_map = {}
-    # issues_to_process_queue = list(initial_issues_to_process) # Old list-based queue
-    # queued_keys = {issue.get('key') for issue in issues_to_process_queue if issue.get('key')} # Old set
 
-    # Thread-safe queue for issues to be processed by workers
-    issues_processing_queue = queue.Queue()
-    # Set to keep track of keys ever added to the queue or submitted to executor to avoid redundant work
-    keys_submitted_to_executor_set = set() 
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    raw_filename = f"jira_export_{fetch_identifier.replace('/', '_').replace(':', '-')}_{timestamp}_raw.json"
+    # Each issue is appended here as soon as its worker finishes, so a crashed or
+    # interrupted run still leaves every completed issue on disk (one JSON object per line)
+    checkpoint_filename = raw_filename.replace('.json', '.jsonl')
+
     # Lock for synchronized access to master_issues_map and keys_submitted_to_executor
     map_and_queue_lock = threading.Lock()
 
-    # Populate initial queue and submitted set
-    for issue_obj in initial_issues_to_process:
-        key = issue_obj.get('key')
-        if key:
-            issues_processing_queue.put(issue_obj)
-            keys_submitted_to_executor_set.add(key)
-        else:
-            logging.warning("Initial issue object missing a key, cannot queue.")
-
     processed_issue_count = 0
     # Max workers for the ThreadPoolExecutor - can be tuned
     # Should be related to, but not necessarily the sum of, API semaphores, 
     # as workers might wait on semaphores or do CPU work.
     MAX_WORKERS = 10 
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {}
+    with open(checkpoint_filename, 'wb') as checkpoint_file, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {} # Future -> issue key, for every issue currently being processed
 
-        # Initial submission of tasks from the queue
-        while not issues_processing_queue.empty():
-            try:
-                current_issue_obj_raw = issues_processing_queue.get_nowait()
+        # Submit everything waiting in the queue, then block until any worker finishes
+        # (its related issues are queued before it returns) and repeat. Waiting on the
+        # futures instead of polling lets the next wave start as soon as one is ready.
+        while True:
+            while True:
+                try:
+                    current_issue_obj_raw = issues_processing_queue.get_nowait()
+                except queue.Empty:
+                    break # Queue is empty for now
                 current_issue_key = current_issue_obj_raw.get('key')
 
                 if not current_issue_key:
-                    logging.warning("Skipping an issue from queue with no key.")
+                    logging.warning("Main: Skipping an issue from queue with no key.")
                     issues_processing_queue.task_done() # Mark as done even if skipped
                     continue
+                # No duplicate check needed: keys are claimed in keys_submitted_to_executor_set
+                # before they are queued, so each issue comes off the queue exactly once
                 
-                # Double check if already processed or submitted to avoid race if queue grows fast
-                with map_and_queue_lock:
-                    if current_issue_key in master_issues_map or current_issue_key in futures:
-                        logging.debug(f"Main: Issue {current_issue_key} already processed or submitted. Skipping.")
-                        issues_processing_queue.task_done()
-                        continue
-                
-                logging.info(f"Main: Submitting {current_issue_key} to executor.")
+                logging.info("Main: Submitting %s to executor.", current_issue_key)
                 future = executor.submit(worker_process_issue, 
                                          current_issue_obj_raw, 
                                          args.skip_remote_content, 
@@ -897,78 +1341,31 @@ def main():
                                          keys_submitted_to_executor_set, # Workers update this set for new items they queue
                                          map_and_queue_lock
                                          )
-                futures[current_issue_key] = future # Track future by key
-            except queue.Empty:
-                break # Queue is empty for now
-
-        # Process completed futures and any new items added to the queue by workers
-        # This loop continues as long as there are active futures or items in the queue.
-        active_futures = True
-        while active_futures or not issues_processing_queue.empty():
-            active_futures = False # Reset for this iteration
-            completed_futures_this_round = []
-
-            for key, future_obj in list(futures.items()): # Iterate over a copy for safe removal
-                if future_obj.done():
-                    completed_futures_this_round.append(key)
-                    try:
-                        processed_key, status = future_obj.result()
-                        logging.info(f"Main: Future for {processed_key} completed with status: {status}")
-                        processed_issue_count +=1
-                    except Exception as exc:
-                        logging.error(f"Main: Future for {key} generated an exception: {exc}", exc_info=True)
-                        # Mark as error in master_issues_map if not already handled by worker
-                        with map_and_queue_lock:
-                            if key not in master_issues_map:
-                                master_issues_map[key] = {"key": key, "error": str(exc), "status": "future_exception"}
-                else:
-                    active_futures = True # At least one future is still running
-            
-            for key in completed_futures_this_round:
-                del futures[key] # Remove completed future
+                futures[future] = current_issue_key
 
-            # Check queue again for items added by workers
-            while not issues_processing_queue.empty():
-                try:
-                    current_issue_obj_raw = issues_processing_queue.get_nowait()
-                    current_issue_key = current_issue_obj_raw.get('key')
-
-                    if not current_issue_key:
-                        logging.warning("Main: Skipping an issue from queue (worker-added) with no key.")
-                        issues_processing_queue.task_done()
-                        continue
-
-                    with map_and_queue_lock:
-                        if current_issue_key in master_issues_map or current_issue_key in futures:
-                            logging.debug(f"Main: Worker-added issue {current_issue_key} already processed/submitted. Skipping.")
-                            issues_processing_queue.task_done()
-                            continue
-                    
-                    logging.info(f"Main: Submitting worker-added task {current_issue_key} to executor.")
-                    future = executor.submit(worker_process_issue, 
-                                             current_issue_obj_raw, 
-                                             args.skip_remote_content, 
-                                             issues_processing_queue, 
-                                             master_issues_map, 
-                                             keys_submitted_to_executor_set, 
-                                             map_and_queue_lock
-                                             )
-                    futures[current_issue_key] = future
-                    active_futures = True # New future submitted
-                except queue.Empty:
-                    break
-            
-            if not active_futures and issues_processing_queue.empty():
+            if not futures:
                 logging.info("Main: No active futures and queue is empty. Exiting processing loop.")
                 break
-            
-            if completed_futures_this_round or active_futures: # Only sleep if work was done or is ongoing
-                time.sleep(0.1) # Short sleep to prevent busy-waiting if queue is temporarily empty but futures are active
 
-    # --- Old single-threaded loop (for reference, to be removed/commented) ---
-    # while issues_to_process_queue:
-    #     current_issue_obj_raw = issues_to_process_queue.pop(0) 
-    # ... (rest of old loop) ...
+            done_futures, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future_obj in done_futures:
+                key = futures.pop(future_obj)
+                try:
+                    processed_key, status = future_obj.result()
+                    logging.info("Main: Future for %s completed with status: %s", processed_key, status)
+                    processed_issue_count +=1
+                except Exception as exc:
+                    logging.error(f"Main: Future for {key} generated an exception: {exc}", exc_info=True)
+                    # Mark as error in master_issues_map if not already handled by worker
+                    with map_and_queue_lock:
+                        if key not in master_issues_map:
+                            master_issues_map[key] = {"key": key, "error": str(exc), "status": "future_exception"}
+                # Only this issue's worker writes its entry, so it is complete once the future is done
+                with map_and_queue_lock:
+                    issue_record = master_issues_map.get(key)
+                if issue_record is not None:
+                    checkpoint_file.write(_encode_json_line(issue_record))
+                    checkpoint_file.flush()
 
     all_data["processed_issues_data"] = list(master_issues_map.values())
     all_data["export_metadata"]["total_unique_issues_processed"] = len(all_data["processed_issues_data"])
@@ -976,10 +1373,9 @@ def main():
     logging.info(f"\nTotal distinct issues processed and stored: {len(all_data['processed_issues_data'])}")
     
     logging.info("\n" + "=" * 60)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    raw_filename = f"jira_export_{fetch_identifier.replace('/', '_').replace(':', '-')}_{timestamp}_raw.json"
     save_to_json(all_data, raw_filename)
+    os.remove(checkpoint_filename) # The raw export now holds every issue in the checkpoint
     
     logging.info(f"\n📁 File created:")
     logging.info(f"   • {raw_filename} - Complete raw Jira data")